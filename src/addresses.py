@@ -0,0 +1,114 @@
+"""
+Canonical address keys and the de-duplication pass run before scheduling.
+
+Lead lists spell the same property in different ways ("St" vs "Street",
+"Apt 4" vs "#4", upper/lower case, ZIP vs ZIP+4). Every spelling maps to
+one key; only the first spelling of each key is searched and its result is
+written out again for every other input row with that key.
+"""
+
+import re
+from dataclasses import replace
+
+
+# USPS street suffix abbreviations (the common ones in our lead lists)
+SUFFIXES = {
+    "alley": "aly", "avenue": "ave", "av": "ave", "boulevard": "blvd", "circle": "cir", "court": "ct",
+    "cove": "cv", "crossing": "xing", "drive": "dr", "expressway": "expy", "freeway": "fwy",
+    "highway": "hwy", "lane": "ln", "loop": "loop", "parkway": "pkwy", "place": "pl", "plaza": "plz",
+    "point": "pt", "road": "rd", "route": "rte", "square": "sq", "street": "st", "str": "st",
+    "terrace": "ter", "trail": "trl", "turnpike": "tpke", "way": "way",
+}
+
+DIRECTIONALS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+
+# Every secondary unit designator becomes "unit"; the unit number itself is kept
+UNIT_DESIGNATORS = {"apt", "apartment", "unit", "ste", "suite", "rm", "room"}
+
+_ZIP4 = re.compile(r"\b(\d{5})-\d{4}\b")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def canonical_address(address):
+    """Spelling-insensitive key for an address, e.g. "12 N Main St Apt 4, X, IL 62704".
+
+    Lowercases, drops punctuation and the ZIP+4 extension, and abbreviates
+    suffixes, directionals and unit designators the USPS way. Different
+    units stay different keys.
+    """
+    text = _ZIP4.sub(r"\1", str(address).lower()).replace("#", " unit ")
+    tokens = []
+    for token in _NON_WORD.sub(" ", text).split():
+        if token in UNIT_DESIGNATORS:
+            token = "unit"
+            if tokens and tokens[-1] == "unit":
+                continue  # "Apt #4"
+        else:
+            token = SUFFIXES.get(token) or DIRECTIONALS.get(token) or token
+        tokens.append(token)
+    return " ".join(tokens)
+
+
+class LeadGroups:
+    """Input rows grouped by canonical address, filled incrementally with add().
+
+    The first spelling of each key is the one that gets searched; ``unique``
+    lists those in input order.
+    """
+
+    def __init__(self, addresses=()):
+        self.unique = []
+        self.rows = 0
+        self._variants = {}
+        self._first = {}
+        for address in addresses:
+            self.add(address)
+
+    def add(self, address):
+        """Register one input row; return True when it is the first of its key."""
+        self.rows += 1
+        key = canonical_address(address)
+        first = self._first.get(key)
+        if first is None:
+            self._first[key] = address
+            self._variants[address] = [address]
+            self.unique.append(address)
+            return True
+        self._variants[first].append(address)
+        return False
+
+    def add_variants(self, address, variants):
+        """Restore the input rows of an already searched address (e.g. from a work queue)."""
+        self._first.setdefault(canonical_address(address), address)
+        self._variants[address] = list(variants)
+
+    def first(self, address):
+        """The spelling that gets searched for ``address``'s key, or None before it was added."""
+        return self._first.get(canonical_address(address))
+
+    def variant_pairs(self):
+        """(searched address, other input row) for every duplicate row, in input order per address."""
+        for address in self.unique:
+            for variant in self.variants(address)[1:]:
+                yield address, variant
+
+    def variants(self, address):
+        """Every input row that ``address`` stands for, itself included."""
+        return self._variants.get(address, [address])
+
+    def expand(self, record):
+        """One copy of ``record`` per input row of its address."""
+        return [record if variant == record.address else replace(record, address=variant)
+                for variant in self.variants(record.address)]
+
+    @property
+    def saved(self):
+        """Browser sessions not spent on duplicate rows."""
+        return self.rows - len(self.unique)
+
+    def summary(self):
+        return (f"Deduplicated {self.rows} input rows to {len(self.unique)} addresses, "
+                f"saving {self.saved} browser sessions")
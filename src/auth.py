@@ -0,0 +1,168 @@
+"""
+Single shared RPR login whose cookies and local storage are injected into every worker browser.
+"""
+
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from elements import element_exists_xpath
+from waits import PROFILES, document_complete, element_present, wait_until
+
+
+# Overridable to point the pipeline at the offline replay server (replay_server.py)
+RPR_BASE_URL = os.environ.get("RPR_BASE_URL", "https://www.narrpr.com").rstrip("/")
+RPR_AUTH_URL = os.environ.get("RPR_AUTH_URL", "https://auth.narrpr.com").rstrip("/")
+
+SIGN_IN_URL = f'{RPR_AUTH_URL}/auth/sign-in'
+SIGN_IN_HOST = urlparse(RPR_AUTH_URL).netloc
+HOME_URL = f'{RPR_BASE_URL}/home'
+
+# Fields accepted by the CDP Network.setCookies command
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+def sign_in(browser, email, password, profile=PROFILES["default"]):
+    """Fill in and submit the RPR sign-in form and wait until the site lets us in."""
+    browser.get(SIGN_IN_URL)
+    wait_until(browser, document_complete, profile.page_load, "sign_in_page")
+
+    # Handle potential dialog
+    if element_exists_xpath(browser, '//*[@id="mat-mdc-dialog-0"]/div/div'):
+        browser.get(SIGN_IN_URL)
+        wait_until(browser, document_complete, profile.page_load, "sign_in_page")
+
+    wait_until(browser, element_present('//*[@id="SignInEmail"]'), profile.page_load, "sign_in_form")
+
+    email_field = browser.find_element("css selector", "#SignInEmail")
+    email_field.clear()
+    email_field.send_keys(email)
+
+    password_field = browser.find_element("css selector", "#SignInPassword")
+    password_field.clear()
+    password_field.send_keys(password)
+
+    login_button = browser.find_element("css selector", "#SignInBtn")
+    login_button.click()
+    wait_until(browser, lambda b: not is_signed_out(b), profile.login_redirect, "login_redirect")
+
+
+def is_signed_out(browser):
+    """Return True when the site bounced the browser back to sign-in."""
+    return SIGN_IN_HOST in browser.current_url
+
+
+class AuthSession:
+    """Logs in once and shares the resulting session with every driver.
+
+    The captured cookies and local storage are persisted to ``session_file``
+    with an expiry, so a restart within ``lifetime`` seconds skips login.
+    Each login bumps ``generation``; a driver that gets bounced to sign-in
+    while holding the current generation triggers one re-login, and every
+    other bounced driver just picks up the refreshed state.
+    """
+
+    def __init__(self, sign_in_func, session_file="rpr_session.json", lifetime=4 * 3600, log=print):
+        self.sign_in_func = sign_in_func
+        self.session_file = session_file
+        self.lifetime = lifetime
+        self.log = log
+
+        self.generation = 0
+        self._state = None
+        self._applied = {}
+        self._lock = threading.Lock()
+
+    def apply(self, driver):
+        """Make ``driver`` logged in, using the shared session when possible."""
+        with self._lock:
+            if self._state is None:
+                self._state = self._load()
+
+            stale = self._applied.get(id(driver)) == self.generation
+            if self._state is None or self._expired(self._state) or stale:
+                self._login(driver)
+                return
+
+            state = self._state
+            generation = self.generation
+
+        self._inject(driver, state)
+        if is_signed_out(driver):
+            # Persisted session was rejected by the site, log in for real
+            with self._lock:
+                if self.generation == generation:
+                    self._login(driver)
+                    return
+            self.apply(driver)
+            return
+
+        with self._lock:
+            self._applied[id(driver)] = generation
+
+    def forget(self, driver):
+        """Drop bookkeeping for a driver that is being quit."""
+        with self._lock:
+            self._applied.pop(id(driver), None)
+
+    def _login(self, driver):
+        """Sign in with ``driver`` and capture its session. Caller holds the lock."""
+        self.log("Logging in to RPR")
+        self.sign_in_func(driver)
+
+        self._state = self._capture(driver)
+        self.generation += 1
+        self._applied[id(driver)] = self.generation
+        self._save(self._state)
+
+    def _capture(self, driver):
+        """Read cookies for every narrpr domain plus the app's local storage."""
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        if not driver.current_url.startswith(HOME_URL):
+            driver.get(HOME_URL)
+        local_storage = driver.execute_script(
+            "return Object.fromEntries(Object.entries(window.localStorage));"
+        )
+        return {
+            "cookies": [{k: c[k] for k in COOKIE_FIELDS if k in c} for c in cookies],
+            "local_storage": local_storage or {},
+            "expires_at": time.time() + self.lifetime,
+        }
+
+    def _inject(self, driver, state):
+        """Load a captured session into ``driver`` and land it on the home page."""
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": state["cookies"]})
+        driver.get(HOME_URL)
+
+        if state["local_storage"] and not is_signed_out(driver):
+            driver.execute_script(
+                "for (const [k, v] of Object.entries(arguments[0])) { window.localStorage.setItem(k, v); }",
+                state["local_storage"]
+            )
+            driver.get(HOME_URL)
+
+    def _expired(self, state):
+        return state["expires_at"] <= time.time()
+
+    def _load(self):
+        """Return the persisted session, or None if missing, unreadable or expired."""
+        try:
+            with open(self.session_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self._expired(state):
+            return None
+        self.log("Reusing saved RPR session")
+        return state
+
+    def _save(self, state):
+        """Persist the session; the file holds live auth cookies so keep it private."""
+        tmp_path = f"{self.session_file}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.session_file)
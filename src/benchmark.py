@@ -0,0 +1,180 @@
+"""
+End-to-end throughput benchmark against the offline replay server.
+
+Runs the real engine (Chrome, session pool, extraction, output writer) on
+synthetic leads and reports leads/min, p50/p95 per-lead latency, the peak
+RSS of this process plus its chromedriver/Chrome children, and the memory
+and bytes transferred per browser:
+
+    python benchmark.py --leads 100 --workers 4 --latency 0.3 --dialog-rate 0.05
+    python benchmark.py --no-blocking       # compare against loading every resource
+
+Pacing is off unless ``--rate-limits`` is given: against the replay server
+it would cap leads/min instead of the pipeline being measured.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from openpyxl import Workbook
+
+from concurrency import process_tree_rss_mb
+from rate_limit import RateLimits, load_rate_limits
+
+
+# Rates and burst no benchmark gets near, so the token buckets never make a worker wait
+UNPACED = RateLimits(page_load=1e6, search=1e6, tab_click=1e6, burst=10 ** 6)
+
+
+class PeakRss(threading.Thread):
+    """Samples process_tree_rss_mb() every ``interval`` seconds and keeps the maximum."""
+
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            current = process_tree_rss_mb()
+            if current is not None:
+                self.peak = max(self.peak or 0.0, current)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def write_leads(path, count, not_found_every=0):
+    workbook = Workbook()
+    sheet = workbook.active
+    for i in range(count):
+        address = f"{100 + i} Benchmark Ave, Springfield, IL 62704"
+        if not_found_every and i % not_found_every == not_found_every - 1:
+            address = f"{100 + i} NOTFOUND Rd, Nowhere, ZZ 00000"
+        sheet.append([address])
+    workbook.save(path)
+
+
+def run_benchmark(leads=50, workers=4, profile="fast", output_format="xlsx", port=8765, not_found_every=0,
+                  blocking=True, tabs_per_browser=1, rate_limits=None, **server_options):
+    """Start the replay server, run the engine on synthetic leads and return the report dict.
+
+    ``rate_limits`` paces the run like a real one; by default nothing is paced.
+    """
+    from replay_server import start_server
+
+    server, app_url, auth_url = start_server(port, **server_options)
+    # auth.py reads these at import time, so the engine is imported afterwards
+    os.environ["RPR_BASE_URL"] = app_url
+    os.environ["RPR_AUTH_URL"] = auth_url
+    # The replay server accepts any login
+    os.environ.setdefault("RPR_EMAIL", "benchmark@example.com")
+    os.environ.setdefault("RPR_PASSWORD", "benchmark")
+    from browser_profile import ResourceFilter
+    from engine import ExtractionEngine
+    from output_writer import OUTPUT_FORMATS
+
+    workdir = Path(tempfile.mkdtemp(prefix="rpr_bench_"))
+    input_path = workdir / "leads.xlsx"
+    output_path = workdir / f"output{OUTPUT_FORMATS[output_format][1]}"
+    write_leads(input_path, leads, not_found_every)
+
+    latencies = []
+    outcomes = {}
+
+    def on_event(event):
+        if event["type"] == "lead":
+            latencies.append(event["seconds"])
+            outcomes[event["outcome"]] = outcomes.get(event["outcome"], 0) + 1
+
+    # Fixed concurrency and a throwaway cache/session so runs are comparable
+    engine = ExtractionEngine(
+        workers=workers,
+        min_workers=workers,
+        profile=profile,
+        output_format=output_format,
+        session_file=str(workdir / "session.json"),
+        cache_path=str(workdir / "cache.sqlite"),
+        resource_filter=None if blocking else ResourceFilter(block=()),
+        tabs_per_browser=tabs_per_browser,
+        rate_limits=rate_limits or UNPACED
+    )
+    engine.subscribe(on_event)
+
+    rss = PeakRss()
+    rss.start()
+    start = time.time()
+    try:
+        engine.run(str(input_path), str(output_path))
+    finally:
+        elapsed = time.time() - start
+        rss.stop()
+        server.shutdown()
+    snapshot = engine.metrics.snapshot()
+
+    return {
+        "leads": leads,
+        "workers": workers,
+        "profile": profile,
+        "elapsed_s": round(elapsed, 2),
+        "leads_per_min": round(60 * leads / elapsed, 2) if elapsed else None,
+        "p50_s": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_s": round(percentile(latencies, 0.95), 2) if latencies else None,
+        "peak_rss_mb": round(rss.peak, 1) if rss.peak is not None else None,
+        "blocking": blocking,
+        "tabs_per_browser": tabs_per_browser,
+        "paced": rate_limits is not None,
+        "mb_transferred": round(snapshot["counters"].get("bytes_transferred", 0) / 2 ** 20, 2),
+        "browsers": snapshot["workers"],
+        "outcomes": outcomes,
+        "server": server_options,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against the replay server.")
+    parser.add_argument("--leads", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--profile", default="fast")
+    parser.add_argument("--format", default="xlsx")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--dialog-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--not-found-every", type=int, default=0, help="Make every Nth lead a not-found address")
+    parser.add_argument("--tabs-per-browser", type=int, default=1)
+    parser.add_argument("--no-blocking", action="store_true", help="Do not block fonts, maps, analytics...")
+    parser.add_argument("--rate-limits", help='Pace the run with the "default" rates of this JSON file (see cli.py)')
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        leads=args.leads, workers=args.workers, profile=args.profile, output_format=args.format,
+        port=args.port, not_found_every=args.not_found_every, blocking=not args.no_blocking, tabs_per_browser=args.tabs_per_browser, latency=args.latency, jitter=args.jitter,
+        dialog_rate=args.dialog_rate, stall_rate=args.stall_rate,
+        rate_limits=load_rate_limits(args.rate_limits, "default") if args.rate_limits else None
+    )
+    print(json.dumps(report, indent=2))
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Lean Chrome launch profile and request blocking for the worker browsers.
+
+The property pages pull in web fonts, map tiles, chart libraries,
+analytics and ad beacons that the extraction never reads. They are blocked
+per browser with CDP ``Network.setBlockedURLs``; the page's own scripts and
+API calls are left alone (the site is an Angular app and needs JavaScript).
+"""
+
+import json
+
+
+# Only flags that cut resident memory per browser or stop background traffic;
+# benchmark.py reports RSS and bytes per worker to compare profiles.
+LAUNCH_ARGUMENTS = [
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-notifications",
+    "--disable-infobars",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--blink-settings=imagesEnabled=false",
+    "--ignore-certificate-errors",
+    "--window-size=500,500",
+]
+
+# Extra flags when several tabs share one Chrome: without them, tabs in the
+# background have their timers and rendering throttled
+TAB_ARGUMENTS = [
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+]
+
+# Blocked URL patterns (CDP wildcards) by category
+BLOCK_CATEGORIES = {
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+              "*use.typekit.net*"],
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"],
+    "media": ["*.mp4", "*.webm", "*.mp3"],
+    "maps": ["*maps.googleapis.com*", "*maps.gstatic.com*", "*api.mapbox.com*", "*tiles.mapbox.com*",
+             "*arcgisonline.com*", "*virtualearth.net*", "*/tiles/*"],
+    "charts": ["*highcharts.com*", "*cdn.amcharts.com*"],
+    "analytics": ["*google-analytics.com*", "*googletagmanager.com*", "*analytics.google.com*", "*hotjar.com*",
+                  "*nr-data.net*", "*js-agent.newrelic.com*", "*fullstory.com*", "*segment.io*", "*segment.com*",
+                  "*mixpanel.com*", "*clarity.ms*", "*quantserve.com*", "*pendo.io*"],
+    "ads": ["*doubleclick.net*", "*googlesyndication.com*", "*adservice.google.com*", "*connect.facebook.net*",
+            "*bat.bing.com*", "*ads.linkedin.com*"],
+}
+DEFAULT_BLOCK = tuple(BLOCK_CATEGORIES)
+
+# Sums what the current document has downloaded (cross-origin entries without
+# Timing-Allow-Origin report 0, so this is a lower bound)
+TRANSFER_JS = """
+const entries = performance.getEntriesByType("navigation").concat(performance.getEntriesByType("resource"));
+return entries.reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+# The default buffer of 250 entries fills up on a property page
+RESOURCE_BUFFER_JS = "performance.setResourceTimingBufferSize(5000);"
+
+
+class ResourceFilter:
+    """Which requests a worker browser drops.
+
+    ``block`` and ``allow`` hold category names from BLOCK_CATEGORIES or raw
+    URL patterns. Allowed entries are taken out of the blocked ones, so
+    ``allow=["maps"]`` keeps the default list minus the map patterns.
+    """
+
+    def __init__(self, block=DEFAULT_BLOCK, allow=()):
+        self.block = list(block)
+        self.allow = list(allow)
+
+    def patterns(self):
+        allowed = set(_expand(self.allow))
+        return [pattern for pattern in dict.fromkeys(_expand(self.block)) if pattern not in allowed]
+
+    def install(self, driver):
+        """Start blocking in ``driver`` (lasts for the life of its tab)."""
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": RESOURCE_BUFFER_JS})
+        patterns = self.patterns()
+        if patterns:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+def _expand(entries):
+    for entry in entries:
+        yield from BLOCK_CATEGORIES.get(entry, [entry])
+
+
+def load_resource_filter(path):
+    """ResourceFilter from a JSON file of {"block": [...], "allow": [...]}; block defaults to DEFAULT_BLOCK."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return ResourceFilter(config.get("block", DEFAULT_BLOCK), config.get("allow", ()))
+
+
+def transferred_bytes(driver):
+    """Bytes the current document has downloaded so far, or None if the page cannot tell."""
+    try:
+        return int(driver.execute_script(TRANSFER_JS) or 0)
+    except Exception:
+        return None
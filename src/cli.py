@@ -0,0 +1,102 @@
+"""
+Headless command-line entry point, for cron jobs, containers and CI:
+
+    python cli.py leads.xlsx --output-dir out --workers 4 --profile fast --format csv
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from output_writer import OUTPUT_FORMATS
+from engine import BACKENDS, BACKEND_DOM, MAX_WORKERS, RPR_EMAIL, ExtractionEngine
+from browser_profile import ResourceFilter, load_resource_filter
+from lead_reader import parse_column
+from rate_limit import load_rate_limits
+from waits import PROFILES
+
+
+def print_event(event):
+    """Print engine events as plain log lines."""
+    stamp = datetime.now().strftime("%H:%M:%S")
+    if event["type"] == "log":
+        print(f"{stamp} {event['message']}", flush=True)
+    elif event["type"] == "progress":
+        print(f"{stamp} Progress {event['done']}/{event['total']}", flush=True)
+    elif event["type"] == "finished":
+        status = f"Stopped on error: {event['error']}" if event["error"] else "Finished"
+        print(f"{stamp} {status} {event['done']}/{event['total']} -> {event['output']}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract RPR property data for a list of leads.")
+    parser.add_argument("input", help="xlsx, csv, tsv or txt file with one address per row")
+    parser.add_argument("--sheet", help="Sheet name or 0-based index (Excel input, default: the first sheet)")
+    parser.add_argument("--column", type=parse_column, default=0, help="0-based column index or header name")
+    parser.add_argument("--output", help="Output file (default: <output-dir>/output_<timestamp>.<ext>)")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Most browsers used at once")
+    parser.add_argument("--min-workers", type=int, default=1, help="Fewest browsers the controller scales down to")
+    parser.add_argument("--spare-browsers", type=int, default=1,
+                        help="Logged-in browsers kept ready to replace crashed or recycled ones")
+    parser.add_argument("--tabs-per-browser", type=int, default=1,
+                        help="Leads sharing one Chrome process, one tab each")
+    parser.add_argument("--profile", default="default", choices=list(PROFILES))
+    parser.add_argument("--backend", default=BACKEND_DOM, choices=list(BACKENDS))
+    parser.add_argument("--format", default="xlsx", choices=list(OUTPUT_FORMATS))
+    parser.add_argument("--rate-limits", help="JSON file of per-account rates (see rate_limit.RateLimits)")
+    parser.add_argument("--metrics-dir", help="Where metrics.json / metrics.prom go (default: next to the output)")
+    parser.add_argument("--metrics-interval", type=float, default=60, help="Seconds between metrics exports")
+    parser.add_argument("--slow-lead", type=float, default=60, help="Flag leads slower than this many seconds")
+    parser.add_argument("--block-list", help='JSON file of {"block": [...], "allow": [...]} request patterns')
+    parser.add_argument("--no-blocking", action="store_true", help="Let the browsers load every resource")
+    parser.add_argument("--retries", type=int, default=3, help="Attempts per lead before it goes to the Failures sheet")
+    parser.add_argument("--retry-backoff", type=float, default=30, help="Seconds before the first retry, doubled after")
+    parser.add_argument("--lead-deadline", type=float, default=300,
+                        help="Kill a lead's browser after this many seconds (0: no deadline)")
+    parser.add_argument("--resume", action="store_true", help="Skip leads already finished in the journal")
+    args = parser.parse_args(argv)
+
+    output = args.output
+    if not output:
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        output = str(Path(args.output_dir) / f"output_{timestamp}{OUTPUT_FORMATS[args.format][1]}")
+
+    resource_filter = None
+    if args.no_blocking:
+        resource_filter = ResourceFilter(block=())
+    elif args.block_list:
+        resource_filter = load_resource_filter(args.block_list)
+
+    engine = ExtractionEngine(
+        workers=args.workers,
+        min_workers=args.min_workers,
+        profile=args.profile,
+        backend=args.backend,
+        output_format=args.format,
+        resume=args.resume,
+        rate_limits=load_rate_limits(args.rate_limits, RPR_EMAIL) if args.rate_limits else None,
+        metrics_dir=args.metrics_dir,
+        metrics_interval=args.metrics_interval,
+        slow_lead=args.slow_lead,
+        sheet=args.sheet,
+        column=args.column,
+        resource_filter=resource_filter,
+        spare_browsers=args.spare_browsers,
+        tabs_per_browser=args.tabs_per_browser,
+        retry_attempts=args.retries,
+        retry_backoff=args.retry_backoff,
+        lead_deadline=args.lead_deadline
+    )
+    engine.subscribe(print_event)
+
+    try:
+        engine.run(args.input, output)
+    except Exception:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
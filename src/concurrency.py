@@ -0,0 +1,266 @@
+"""
+Adaptive limit on how many leads are extracted at once.
+
+Workers take a slot before opening a browser session. Every ``interval``
+seconds the controller looks at the leads finished since the last change
+(latency, timeout and error rate) and at host free memory and CPU, and
+moves the limit up or down between ``min_workers`` and ``max_workers``.
+"""
+
+import os
+import signal
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:  # Host metrics fall back to /proc, or are skipped
+    psutil = None
+
+
+OK = "ok"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+
+class HostMetrics:
+    """Free memory (MB) and CPU busy percentage, from psutil or /proc; None if unknown."""
+
+    def __init__(self):
+        self._last_cpu = self._read_proc_stat()
+        if psutil is not None:
+            psutil.cpu_percent(None)  # First call only sets the baseline
+
+    def free_memory_mb(self):
+        if psutil is not None:
+            return psutil.virtual_memory().available / 2 ** 20
+        try:
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return None
+
+    def cpu_percent(self):
+        """CPU busy percentage since the previous call."""
+        if psutil is not None:
+            return psutil.cpu_percent(None)
+        current = self._read_proc_stat()
+        if current is None or self._last_cpu is None:
+            return None
+        busy = current[0] - self._last_cpu[0]
+        total = current[1] - self._last_cpu[1]
+        self._last_cpu = current
+        return 100.0 * busy / total if total else None
+
+    @staticmethod
+    def _read_proc_stat():
+        """(busy, total) jiffies from the aggregate cpu line of /proc/stat."""
+        try:
+            with open("/proc/stat") as f:
+                values = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle = values[3] + (values[4] if len(values) > 4 else 0)
+        return sum(values) - idle, sum(values)
+
+
+def process_tree_rss_mb(pid=None):
+    """Resident memory of ``pid`` (default: this process) and all its descendants in MB, or None."""
+    pid = pid or os.getpid()
+    return process_trees_rss_mb([pid]).get(pid)
+
+
+def process_trees_rss_mb(pids):
+    """{pid: MB} for each process tree rooted at ``pids``, reading the process table once."""
+    if psutil is not None:
+        sizes = {}
+        for pid in pids:
+            try:
+                root = psutil.Process(pid)
+                processes = [root] + root.children(recursive=True)
+            except psutil.NoSuchProcess:
+                continue
+            total = 0
+            for process in processes:
+                try:
+                    total += process.memory_info().rss
+                except psutil.NoSuchProcess:
+                    pass
+            sizes[pid] = total / 2 ** 20
+        return sizes
+
+    if not os.path.isdir("/proc"):
+        return {}
+    children = {}
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as f:
+                status = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            continue
+        children.setdefault(int(status["PPid"]), []).append(int(entry))
+        rss[int(entry)] = int(status.get("VmRSS", "0 kB").split()[0]) / 1024
+
+    sizes = {}
+    for pid in pids:
+        if pid not in rss:
+            continue
+        total, stack = 0.0, [pid]
+        while stack:
+            current = stack.pop()
+            total += rss.get(current, 0.0)
+            stack.extend(children.get(current, []))
+        sizes[pid] = total
+    return sizes
+
+
+def kill_process_tree(pid):
+    """Kill ``pid`` and all its descendants, children first; processes already gone are skipped."""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = root.children(recursive=True) + [root]
+        except psutil.NoSuchProcess:
+            return
+        for process in processes:
+            try:
+                process.kill()
+            except psutil.NoSuchProcess:
+                pass
+        return
+
+    children = {}
+    if os.path.isdir("/proc"):
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    # The command name may contain spaces; the parent pid follows its closing parenthesis
+                    parent = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(parent, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    for current in reversed(tree):
+        try:
+            # Windows has no SIGKILL; SIGTERM terminates the process there
+            os.kill(current, getattr(signal, "SIGKILL", signal.SIGTERM))
+        except OSError:
+            pass
+
+
+class ConcurrencyController:
+    """Resizable semaphore whose size follows lead outcomes and host load.
+
+    The limit drops by a quarter when timeouts/errors exceed ``max_failure_rate``,
+    latency climbs past ``slowdown`` times the best window seen, free memory
+    falls under ``worker_memory_mb`` or CPU is above ``max_cpu``. It grows by
+    one while everything is healthy and there is room for another browser.
+    ``on_resize(limit)`` is called after every change.
+    """
+
+    def __init__(self, min_workers=1, max_workers=9, initial=None, interval=30, min_samples=5,
+                 max_failure_rate=0.2, slowdown=1.5, worker_memory_mb=400, max_cpu=90,
+                 log=print, on_resize=None):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.limit = initial or max(self.min_workers, self.max_workers // 2)
+        self.limit = min(max(self.limit, self.min_workers), self.max_workers)
+        self.interval = interval
+        self.min_samples = min_samples
+        self.max_failure_rate = max_failure_rate
+        self.slowdown = slowdown
+        self.worker_memory_mb = worker_memory_mb
+        self.max_cpu = max_cpu
+        self.log = log
+        self.on_resize = on_resize
+
+        self.host = HostMetrics()
+        self.changes = []
+        self._active = 0
+        self._samples = []
+        self._baseline_latency = None
+        self._last_change = time.time()
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the ``limit`` slots for the duration of the ``with`` block."""
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def record(self, latency, outcome=OK):
+        """Report one finished lead; may adjust the limit."""
+        with self._cond:
+            self._samples.append((latency, outcome))
+            if len(self._samples) < self.min_samples or time.time() - self._last_change < self.interval:
+                return
+            samples, self._samples = self._samples, []
+            new_limit, reason = self._decide(samples)
+            self._last_change = time.time()
+            if new_limit == self.limit:
+                return
+            old_limit, self.limit = self.limit, new_limit
+            self.changes.append((time.time(), old_limit, new_limit, reason))
+            self._cond.notify_all()
+
+        self.log(f"Concurrency {old_limit} -> {new_limit}: {reason}")
+        if self.on_resize is not None:
+            self.on_resize(new_limit)
+
+    def _decide(self, samples):
+        """Return (new limit, reason) for one window of samples."""
+        failures = sum(1 for _, outcome in samples if outcome != OK)
+        failure_rate = failures / len(samples)
+        latencies = [latency for latency, outcome in samples if outcome == OK]
+        median = statistics.median(latencies) if latencies else None
+        free_mb = self.host.free_memory_mb()
+        cpu = self.host.cpu_percent()
+
+        stats = f"{len(samples)} leads, {failure_rate:.0%} failed"
+        if median is not None:
+            stats += f", median {median:.1f}s"
+        if free_mb is not None:
+            stats += f", {free_mb:.0f} MB free"
+        if cpu is not None:
+            stats += f", CPU {cpu:.0f}%"
+
+        if median is not None and (self._baseline_latency is None or median < self._baseline_latency):
+            self._baseline_latency = median
+
+        shrink = max(self.min_workers, min(self.limit - 1, int(self.limit * 0.75)))
+        if failure_rate > self.max_failure_rate:
+            return shrink, f"timeouts/errors ({stats})"
+        if free_mb is not None and free_mb < self.worker_memory_mb:
+            return shrink, f"low memory ({stats})"
+        if cpu is not None and cpu > self.max_cpu:
+            return shrink, f"CPU saturated ({stats})"
+        if median is not None and median > self._baseline_latency * self.slowdown:
+            return max(self.min_workers, self.limit - 1), f"site slowing down ({stats})"
+
+        room = free_mb is None or free_mb > 2 * self.worker_memory_mb
+        if room and self.limit < self.max_workers and self._active >= self.limit:
+            return self.limit + 1, f"healthy ({stats})"
+        return self.limit, stats
+
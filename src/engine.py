@@ -0,0 +1,766 @@
+"""
+Headless extraction engine.
+
+Runs the whole pipeline (read leads, pooled browsers, extraction, journal,
+cache, output writer) without any GUI. Front ends subscribe to progress
+events instead of being called into:
+
+    {"type": "log", "message": str}
+    {"type": "progress", "done": int, "total": int}
+    {"type": "lead", "address": str, "outcome": "ok" | "timeout" | "error", "seconds": float,
+     "failure": None or a class from failures.py}
+    {"type": "finished", "output": str, "done": int, "total": int, "error": None or str}
+
+"error" is set when the run stopped on an exception (which run() re-raises).
+
+Input rows that spell the same address differently are searched once and
+the result is written for each of them; progress counts input rows.
+Failed leads are classified; transient failures are retried later in the
+run and the rest are written to the Failures sheet. A lead still running
+``lead_deadline`` seconds after it got a browser has that browser killed
+and counts as a timeout in the stage it was stuck in.
+"""
+
+import os
+import threading
+import time
+import concurrent.futures
+from contextlib import nullcontext
+from dataclasses import replace
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    JavascriptException,
+    StaleElementReferenceException,
+    TimeoutException
+)
+
+from elements import element_exists_id, element_exists_xpath, click_close_button, scroll
+from excel_helpers import read_table
+from lead_reader import read_leads
+from session_pool import SessionPool
+from tabs import TabAllocator
+from browser_profile import LAUNCH_ARGUMENTS, TAB_ARGUMENTS, ResourceFilter, transferred_bytes
+from concurrency import ERROR, OK, TIMEOUT, ConcurrencyController, process_tree_rss_mb
+from metrics import RunMetrics
+from rate_limit import PAGE_LOAD, SEARCH, TAB_CLICK, RateLimiter
+from output_writer import FailedLead, LeadRecord, OutputWriter, open_sink
+import failures
+from failures import DIALOG, NOT_FOUND, SESSION_EXPIRED, LeadFailure, RetryQueue, classify, describe
+from journal import Journal
+from watchdog import LeadWatchdog
+from result_cache import ResultCache
+from formatting import clean_address
+from addresses import LeadGroups
+from auth import AuthSession, HOME_URL, is_signed_out, sign_in
+import network_capture
+import page_snapshot
+from page_snapshot import HOUSE_FEATURE_X
+from waits import PROFILES, any_of, element_present, page_ready, text_contains, text_ready, wait_stats, wait_until
+
+
+# The RPR account every worker logs in with
+RPR_EMAIL = os.environ.get("RPR_EMAIL")
+RPR_PASSWORD = os.environ.get("RPR_PASSWORD")
+MAX_WORKERS = 9
+
+# Bounds on the retry loops of a search, on top of the per-lead deadline
+SEARCH_BAR_REFRESHES = 3
+SEARCH_BAR_CLICKS = 5
+
+# Extraction backends selectable per run
+BACKEND_DOM = "dom"
+BACKEND_NETWORK = "network"
+BACKENDS = (BACKEND_DOM, BACKEND_NETWORK)
+
+
+def require_credentials():
+    """Raise unless the RPR login is configured, before any browser is started."""
+    missing = [name for name, value in (("RPR_EMAIL", RPR_EMAIL), ("RPR_PASSWORD", RPR_PASSWORD)) if not value]
+    if missing:
+        raise RuntimeError(f"Set {' and '.join(missing)} to your RPR login before starting a run")
+
+
+class ExtractionEngine:
+    """One batch run: ``run(input_path, output_path)`` with the options given here.
+
+    ``workers`` is the most leads extracted at once; the concurrency controller
+    adjusts the actual number between ``min_workers`` and ``workers``. With
+    ``tabs_per_browser`` above 1 each lead gets a tab and that many leads
+    share one Chrome process.
+    """
+
+    def __init__(self, workers=MAX_WORKERS, profile="default", backend=BACKEND_DOM, output_format="xlsx",
+                 resume=False, session_file="rpr_session.json", cache_path="rpr_cache.sqlite", min_workers=1,
+                 rate_limits=None, metrics_dir=None, metrics_interval=60, slow_lead=60, sheet=None, column=0,
+                 resource_filter=None, spare_browsers=1, tabs_per_browser=1, retry_attempts=3, retry_backoff=30.0,
+                 lead_deadline=300):
+        self.workers = workers
+        self.min_workers = min(min_workers, workers)
+        self.wait_profile = PROFILES[profile]
+        self.extraction_backend = backend
+        self.output_format = output_format
+        self.resume = resume
+        # Where the addresses are in the input file (see lead_reader.read_leads)
+        self.sheet = sheet
+        self.column = column
+
+        # Requests each browser drops (fonts, map tiles, analytics...)
+        self.resource_filter = resource_filter if resource_filter is not None else ResourceFilter()
+        # Launched and logged-in browsers kept ready to replace crashed or recycled ones
+        self.spare_browsers = spare_browsers
+        self.tabs_per_browser = tabs_per_browser
+        self.tabs = None
+        # Attempts per lead (first one included) and the first retry's delay in seconds
+        self.retry_attempts = retry_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_queue = None
+        # Seconds a lead may hold a browser before the watchdog kills it (None: no deadline)
+        self.lead_deadline = lead_deadline
+        self.watchdog = None
+        self.auth_session = AuthSession(self._login_to_rpr, session_file=session_file, log=self.log_message)
+        self.result_cache = ResultCache(cache_path)
+        # Shared by every worker: they all use the same account
+        self.rate_limiter = RateLimiter(rate_limits, log=self.log_message)
+        # Exported next to the output unless metrics_dir is given
+        self.metrics_dir = metrics_dir
+        self.metrics = RunMetrics(slow_lead=slow_lead, export_interval=metrics_interval, log=self.log_message)
+
+        self.processed_count = 0
+        self.total_leads = 0
+        self.lead_groups = None
+        self._rows_written = {}
+        self._failures_written = {}
+        self.session_pool = None
+        self.concurrency = None
+        self.output_writer = None
+        self.journal = None
+        self._progress_lock = threading.Lock()
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """Call ``callback(event)`` for every event; callbacks run on engine threads."""
+        self._subscribers.append(callback)
+
+    def _emit(self, event):
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Event subscriber failed: {e}")
+
+    def log_message(self, message):
+        self._emit({"type": "log", "message": message})
+
+    def _progress(self):
+        self._emit({"type": "progress", "done": self.processed_count, "total": self.total_leads})
+
+    def run(self, file_path, output_path):
+        """Process every lead of ``file_path`` and write the results to ``output_path``.
+
+        Leads are scheduled while the file is still being read.
+        """
+        error = None
+        try:
+            require_credentials()
+            self.processed_count = 0
+            self.total_leads = 0
+            wait_stats.reset()
+            self.metrics.export_dir = self.metrics_dir or str(Path(output_path).parent)
+            self.metrics.start()
+
+            # Only the writer thread touches the output from here on
+            sink = open_sink(self.output_format, output_path)
+            self.output_writer = OutputWriter(sink, log=self.log_message, metrics=self.metrics)
+            self.output_writer.start()
+
+            # Each finished lead is journaled so an interrupted run can resume
+            journal_path = Path(output_path).parent / f"{Path(file_path).stem}.journal.sqlite"
+            self.journal = Journal(str(journal_path))
+            if not self.resume:
+                self.journal.reset()
+
+            # Each distinct address is searched once, whatever its spelling
+            self.lead_groups = LeadGroups()
+            self.retry_queue = RetryQueue(self.retry_attempts, self.retry_backoff)
+            self._rows_written = {}
+            self._failures_written = {}
+            for record in self.journal.completed_records():
+                self.output_writer.submit(record)
+                self._rows_written[record.address] = 1
+                self.processed_count += 1
+            finished = self.journal.finished()
+            # Not-found leads are finished too, so their Failures rows come from the journal
+            for failed in self.journal.failed_leads():
+                if failed.address in finished:
+                    self.output_writer.submit_failure(failed)
+                    self._failures_written[failed.address] = (failed, 1)
+            if self.resume:
+                self.log_message(f"Resuming: {len(finished)} leads already finished")
+            self._progress()
+
+            self.session_pool = self._open_pool()
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+                self._schedule_leads(executor, read_leads(file_path, self.sheet, self.column), finished)
+
+            self._write_duplicates()
+            self.log_message(self.lead_groups.summary())
+            self.log_message(f"Retried {self.retry_queue.retried} failed attempts, "
+                             f"{self.output_writer.failures_written} rows on the Failures sheet")
+
+        except Exception as e:
+            error = str(e)
+            self.log_message(f"Unexpected error: {error}")
+            raise
+        finally:
+            self._shutdown()
+            self._emit({
+                "type": "finished",
+                "output": str(output_path),
+                "done": self.processed_count,
+                "total": self.total_leads,
+                "error": error,
+            })
+
+    def _schedule_leads(self, executor, rows, finished, batch_size=500):
+        """Submit each new address as it is read, journaling them in batches.
+
+        At most a few leads per worker wait in the executor, so a huge input
+        is never held in memory and reading pauses while the workers catch up.
+        Retries whose backoff has passed are slipped in between batches; once
+        the input is read, this waits for the remaining retries.
+        """
+        in_flight = threading.BoundedSemaphore(self.workers * 4)
+        lock = threading.Lock()
+        running = 0
+
+        def done(future):
+            nonlocal running
+            with lock:
+                running -= 1
+            in_flight.release()
+            try:
+                future.result()
+            except Exception as e:
+                self.log_message(f"An error occurred: {e}")
+
+        def submit_lead(lead):
+            nonlocal running
+            in_flight.acquire()
+            with lock:
+                running += 1
+            executor.submit(self.process_single_lead, lead).add_done_callback(done)
+
+        def submit(batch, duplicates):
+            self.journal.add_leads(batch)
+            # Journaled so the output can be rebuilt with one row per input row
+            self.journal.add_variants(duplicates)
+            for lead in batch:
+                if lead not in finished:
+                    submit_lead(lead)
+            for lead in self.retry_queue.pop_due():
+                submit_lead(lead)
+            self._progress()
+
+        batch, duplicates = [], []
+        for lead in rows:
+            lead = clean_address(lead)
+            if not lead:
+                continue
+            self.total_leads += 1
+            if self.lead_groups.add(lead):
+                batch.append(lead)
+            else:
+                duplicates.append((self.lead_groups.first(lead), lead))
+            if len(batch) + len(duplicates) >= batch_size:
+                submit(batch, duplicates)
+                batch, duplicates = [], []
+        submit(batch, duplicates)
+
+        while True:
+            for lead in self.retry_queue.pop_due():
+                submit_lead(lead)
+            wait = self.retry_queue.next_due_in()
+            with lock:
+                idle = running == 0
+            if idle and wait is None:
+                return
+            time.sleep(min(1.0, wait if wait is not None else 1.0))
+
+    def _write_duplicates(self):
+        """Write the rows whose address had already been extracted or given up on when they were read."""
+        for address, (failed, written) in list(self._failures_written.items()):
+            for variant in self.lead_groups.variants(address)[written:]:
+                self.output_writer.submit_failure(replace(failed, address=variant))
+
+        for address, written in list(self._rows_written.items()):
+            variants = self.lead_groups.variants(address)[written:]
+            if not variants:
+                continue
+            record = self.journal.record(address)
+            if record is None:
+                continue
+            for variant in variants:
+                self.output_writer.submit(replace(record, address=variant))
+            self.processed_count += len(variants)
+        self._progress()
+
+    def work(self, work_queue, worker):
+        """Claim leads from a shared WorkQueue until it is drained, posting results back to it.
+
+        Used by worker processes (see work_queue.py); the merge step writes the output.
+        """
+        error = None
+        try:
+            require_credentials()
+            self.processed_count = 0
+            self.total_leads = work_queue.remaining()
+            wait_stats.reset()
+            self.metrics.export_dir = self.metrics_dir or os.path.dirname(os.path.abspath(work_queue.path))
+            self.metrics.start()
+            self.journal = work_queue
+            # Duplicates were collapsed when the queue was loaded; merge fans them out
+            self.lead_groups = None
+            self.session_pool = self._open_pool()
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(self._claim_leads, work_queue, f"{worker}/{i}")
+                    for i in range(self.workers)
+                ]
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.log_message(f"An error occurred: {e}")
+        except Exception as e:
+            error = str(e)
+            self.log_message(f"Unexpected error: {error}")
+            raise
+        finally:
+            # The queue belongs to the caller
+            self.journal = None
+            self._shutdown()
+            self._emit({"type": "finished", "output": work_queue.path,
+                        "done": self.processed_count, "total": self.total_leads, "error": error})
+
+    def _claim_leads(self, work_queue, worker, idle_wait=5):
+        while True:
+            property_address = work_queue.claim(worker)
+            if property_address is None:
+                # Leases still out may come back as retries or expire; stop once none are left
+                if not work_queue.remaining():
+                    return
+                time.sleep(idle_wait)
+                continue
+            self.process_single_lead(property_address)
+
+    def _open_pool(self):
+        if self.tabs_per_browser > 1:
+            self.tabs = TabAllocator(self._launch_browser, self.tabs_per_browser)
+
+        # Only as many leads as the controller allows are extracted at once
+        self.concurrency = ConcurrencyController(
+            min_workers=self.min_workers,
+            max_workers=self.workers,
+            log=self.log_message,
+            on_resize=self._resize_pool
+        )
+
+        if self.lead_deadline:
+            self.watchdog = LeadWatchdog(self.lead_deadline, self._lead_expired,
+                                         stage_of=self.metrics.current_stage, log=self.log_message)
+            self.watchdog.start()
+
+        # Logged-in browsers are reused across leads instead of one per lead
+        return SessionPool(
+            self._create_browser,
+            self.auth_session.apply,
+            size=self.concurrency.limit,
+            log=self.log_message,
+            on_discard=self.auth_session.forget,
+            spares=self.spare_browsers,
+            metrics=self.metrics
+        )
+
+    def _resize_pool(self, limit):
+        if self.session_pool is not None:
+            self.session_pool.resize(limit)
+
+    def _shutdown(self):
+        browsers = self.metrics.worker_summary()
+        if browsers:
+            self.log_message(browsers)
+
+        if self.watchdog is not None:
+            self.watchdog.close()
+            if self.watchdog.expired:
+                self.log_message(f"Watchdog: {self.watchdog.expired} leads killed after {self.lead_deadline}s")
+            self.watchdog = None
+
+        if self.session_pool is not None:
+            self.session_pool.close()
+            self.log_message(self.session_pool.summary())
+            self.session_pool = None
+        if self.tabs is not None:
+            self.tabs.close()
+            self.tabs = None
+
+        # Where the waiting went, slowest call site first
+        for line in wait_stats.summary():
+            self.log_message(f"Wait {line}")
+
+        # Write what is still queued and save the final workbook
+        if self.output_writer is not None:
+            self.output_writer.close()
+            self.output_writer = None
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self.metrics.close()
+        for name, stage in sorted(self.metrics.snapshot()["stages"].items(), key=lambda item: -item[1]["sum_s"]):
+            self.log_message(
+                f"Stage {name}: {stage['count']} spans, {stage['sum_s']:.1f}s total, "
+                f"{stage['max_s']:.1f}s max, {stage['commands']} WebDriver commands"
+            )
+        self.log_message(self.rate_limiter.summary())
+        self.log_message(self.result_cache.summary())
+        self.result_cache.close()
+
+    def process_single_lead(self, property_address):
+        """Process a single property lead."""
+        cached, stale = self.result_cache.get(property_address)
+        if cached is not None and not stale:
+            self.log_message(f"Cached {property_address}")
+            self._lead_extracted(cached)
+            return
+
+        with self.concurrency.slot(), self.metrics.lead(property_address) as lead:
+            self.log_message(f"Processing {property_address}...")
+
+            start_time = time.time()
+            outcome = OK
+            failure = None
+            watch = None
+            try:
+                with self.metrics.stage("checkout"):
+                    pooled = self.session_pool.checkout()
+                try:
+                    with self._watch(property_address, pooled) as watch:
+                        self._process_property(pooled.driver, property_address, cached, stale)
+                finally:
+                    self._record_browser(pooled)
+                    self.session_pool.checkin(pooled)
+            except Exception as e:
+                if watch is not None and watch.expired:
+                    # Whatever the killed browser raised, the lead ran out of time
+                    e = LeadFailure(failures.TIMEOUT, f"No result within {self.lead_deadline}s", watch.stage)
+                failure = classify(e)
+                # A missing property is a normal answer as far as pacing and concurrency go
+                if failure == failures.TIMEOUT:
+                    outcome = TIMEOUT
+                elif failure != NOT_FOUND:
+                    outcome = ERROR
+                stage = getattr(e, "stage", None) or self.metrics.failed_stage()
+                self._lead_failed(property_address, failure, stage, e)
+            lead["outcome"] = failure or outcome
+            if outcome == OK:
+                self.rate_limiter.success()
+            elapsed = time.time() - start_time
+            self.concurrency.record(elapsed, outcome)
+            self._emit({"type": "lead", "address": property_address, "outcome": outcome, "seconds": elapsed,
+                        "failure": failure})
+
+    def _watch(self, address, pooled):
+        return self.watchdog.watch(address, pooled) if self.watchdog is not None else nullcontext()
+
+    def _lead_expired(self, watch):
+        """Watchdog callback: kill the browser of a lead past its deadline so its slot frees up."""
+        self.log_message(f"{watch.address}: no result after {time.time() - watch.started:.0f}s "
+                         f"(stuck in {watch.stage or 'unknown stage'}), killing its browser")
+        self.metrics.count("leads_killed")
+        if self.session_pool is not None:
+            self.session_pool.kill(watch.pooled)
+
+    def _lead_failed(self, address, failure, stage, error):
+        """Journal a failed attempt, then queue a retry or put the lead on the Failures sheet."""
+        error = describe(error)
+        if failure == NOT_FOUND:
+            self.journal.mark_not_found(address, stage, error)
+        else:
+            self.journal.mark_failed(address, error, failure, stage)
+
+        if self.retry_queue is not None and self.retry_queue.failed(address, failure):
+            self.log_message(f"{address}: {failure} in {stage or 'unknown stage'} ({error}), will retry")
+            return
+        if failure != NOT_FOUND:
+            self.log_message(f"Giving up on {address}: {failure} in {stage or 'unknown stage'} ({error})")
+
+        if self.output_writer is not None:
+            attempts = self.retry_queue.attempts(address) if self.retry_queue is not None else 1
+            failed = FailedLead(address, failure, stage or "", attempts, str(error))
+            variants = list(self.lead_groups.variants(address)) if self.lead_groups is not None else [address]
+            # Spellings read after this get their row from _write_duplicates
+            self._failures_written[address] = (failed, len(variants))
+            for variant in variants:
+                self.output_writer.submit_failure(replace(failed, address=variant))
+
+    def _process_property(self, browser, property_address, cached=None, stale=()):
+        """Search and extract a single property with an already logged-in browser.
+
+        ``cached`` is the cache entry whose ``stale`` sections need fetching
+        again. The page snapshot reads every other section in one go, so only
+        the record tabs are skipped while their section is still fresh.
+        Raises LeadFailure when the property is not found or its page never loaded.
+        """
+        reused = set()
+        with self.metrics.stage("open_search"):
+            self._open_search_page(browser)
+
+        with self.metrics.stage("search"):
+            found = self._search_property(browser, property_address)
+        if not found:
+            raise LeadFailure(NOT_FOUND, "No location found", "search")
+
+        start_time = time.time()
+        if self.extraction_backend == BACKEND_NETWORK:
+            with self.metrics.stage("network_capture"):
+                data = network_capture.extract_lead_data(browser)
+            if data is None:
+                raise LeadFailure(failures.TIMEOUT, "No property data captured", "network_capture")
+        else:
+            # Wait for the page, then read it in one snapshot
+            with self.metrics.stage("wait_details"):
+                loaded = self._wait_for_details(browser)
+            if not loaded:
+                raise LeadFailure(failures.TIMEOUT, "Property page did not load", "wait_details")
+
+            with self.metrics.stage("snapshot"):
+                data = page_snapshot.general_data(browser)
+            if cached is not None and "records" not in stale:
+                data["records"] = cached.records
+                reused.add("records")
+            else:
+                with self.metrics.stage("records"):
+                    data["records"] = extract_records(browser, self.wait_profile, self.rate_limiter)
+
+        record = LeadRecord(address=property_address, **data)
+        self.result_cache.put(record, reused)
+        self.log_message(
+            f"Extracted {property_address} via {self.extraction_backend} in {time.time() - start_time:.1f}s"
+        )
+        self._lead_extracted(record)
+
+    def _record_browser(self, pooled):
+        """Count what the lead downloaded and sample the browser's memory."""
+        if not self.session_pool.owns(pooled):
+            return  # Killed by the watchdog
+        transferred = transferred_bytes(pooled.driver) or 0
+        self.metrics.count("bytes_transferred", transferred)
+        try:
+            rss_mb = process_tree_rss_mb(pooled.driver.service.process.pid)
+        except AttributeError:
+            rss_mb = None
+        # Tabs of one Chrome share its memory, so they report under the browser's name
+        name = getattr(pooled.driver, "browser_name", None) or f"browser-{pooled.id}"
+        self.metrics.worker(name, rss_mb, transferred)
+
+    def _lead_extracted(self, record):
+        """Journal a finished record, queue it once per input row of its address and report progress."""
+        self.journal.mark_done(record)
+        rows = self.lead_groups.expand(record) if self.lead_groups is not None else [record]
+        if self.lead_groups is not None:
+            self._rows_written[record.address] = len(rows)
+        if self.output_writer is not None:
+            for row in rows:
+                self.output_writer.submit(row)
+
+        with self._progress_lock:
+            self.processed_count += len(rows)
+        self._progress()
+
+    def _open_search_page(self, browser):
+        """Navigate a reused session back to the RPR home search page."""
+        self.rate_limiter.acquire(PAGE_LOAD)
+        browser.get(HOME_URL)
+        if is_signed_out(browser):
+            # Bounced to sign-in: refresh the shared session, then retry
+            self.rate_limiter.backoff("bounced to sign-in")
+            self.auth_session.apply(browser)
+            self.rate_limiter.acquire(PAGE_LOAD)
+            browser.get(HOME_URL)
+            if is_signed_out(browser):
+                raise LeadFailure(SESSION_EXPIRED, "Still signed out after refreshing the session")
+
+    def _create_browser(self):
+        """A configured browser for one lead at a time: a Chrome of its own, or a tab in a shared one."""
+        browser = self.tabs.open_tab() if self.tabs is not None else self._launch_browser()
+        # Request blocking and the capture script are set per tab
+        self.resource_filter.install(browser)
+        if self.extraction_backend == BACKEND_NETWORK:
+            network_capture.install_interceptor(browser)
+        return browser
+
+    def _launch_browser(self):
+        """Start a Chrome instance."""
+        options = Options()
+        for arg in LAUNCH_ARGUMENTS:
+            options.add_argument(arg)
+        if self.tabs_per_browser > 1:
+            # Background tabs must keep running at full speed, and a page load
+            # in one tab should not hold the shared driver until every subresource is in
+            for arg in TAB_ARGUMENTS:
+                options.add_argument(arg)
+            options.page_load_strategy = "eager"
+
+        return self.metrics.instrument(webdriver.Chrome(options=options))
+
+    def _login_to_rpr(self, browser):
+        """Login to RPR system."""
+        sign_in(browser, RPR_EMAIL, RPR_PASSWORD, self.wait_profile)
+
+    def _search_property(self, browser, property_address):
+        """Search for a property in RPR."""
+        search_bar_xpath = '/html/body/rpr-app/rpr-layout/main/rpr-home/div[1]/div/rpr-property-search-form/form/div/div[1]/div[2]/input'
+        not_found_xpath = '/html/body/rpr-app/rpr-layout/main/rpr-home/div[1]/div/rpr-property-search-form/form/div/div[1]/div[2]/div/div/div[1]'
+        details_xpath = '/html/body/rpr-app/rpr-layout/main/rpr-property-details'
+
+        # Wait for search bar to be available, refreshing a few times if it never shows up
+        for refresh in range(SEARCH_BAR_REFRESHES + 1):
+            try:
+                wait_until(browser, element_present(search_bar_xpath), self.wait_profile.search_bar, "search_bar")
+                break
+            except TimeoutException:
+                if refresh == SEARCH_BAR_REFRESHES:
+                    raise LeadFailure(failures.TIMEOUT, f"Search bar missing after {refresh} refreshes", "search")
+                self.rate_limiter.acquire(PAGE_LOAD)
+                browser.refresh()
+
+        search_bar = browser.find_element('xpath', search_bar_xpath)
+
+        # Handle potential intercepting elements
+        for attempt in range(SEARCH_BAR_CLICKS):
+            if self._try_click_element(search_bar):
+                break
+            if element_exists_id(browser, 'mat-mdc-dialog-0'):
+                self.rate_limiter.backoff("interstitial dialog")
+                try:
+                    click_close_button(browser)
+                except (NoSuchElementException, ElementClickInterceptedException,
+                        StaleElementReferenceException, TimeoutException):
+                    # Driver errors (e.g. a browser killed by the watchdog) propagate as they are
+                    raise LeadFailure(DIALOG, "Interstitial dialog could not be closed", "search")
+            else:
+                time.sleep(0.5)
+        else:
+            raise LeadFailure(DIALOG, f"Search bar still covered after {SEARCH_BAR_CLICKS} clicks", "search")
+
+        # Perform search
+        search_bar.clear()
+        search_bar.send_keys(property_address)
+
+        search_button = browser.find_element('xpath',
+                                             "/html/body/rpr-app/rpr-layout/main/rpr-home/div[1]/div/rpr-property-search-form/form/div/div[3]/div/button")
+        if self.extraction_backend == BACKEND_NETWORK:
+            # Only responses to this search may satisfy wait_for_payloads()
+            network_capture.clear_payloads(browser)
+        self.rate_limiter.acquire(SEARCH)
+        search_button.click()
+
+        # Check if property was found: either the details page shows up or the
+        # search dropdown says so (it is there, listing suggestions, before that)
+        start_time = time.time()
+        try:
+            found = wait_until(browser, any_of(element_present(details_xpath),
+                                               text_contains(not_found_xpath, "NO LOCATION FOUND")),
+                               self.wait_profile.search_result, "search_result")
+        except TimeoutException:
+            found = None
+        self.rate_limiter.observe(time.time() - start_time, "search")
+
+        if found == 2:
+            self.log_message(f"Property Not Found: {property_address}")
+            return False
+
+        wait_until(browser, page_ready, self.wait_profile.page_load, "details_page")
+
+        return True
+
+    def _try_click_element(self, element):
+        """Try to click an element, handling potential interception."""
+        try:
+            element.click()
+            return True
+        except ElementClickInterceptedException:
+            return False
+
+    def _wait_for_details(self, browser):
+        """Wait until the house features have rendered; False if the page never loaded.
+
+        The estimate is optional, so it gets no wait of its own: the snapshot
+        taken after this reads it if the property has one.
+        """
+        if self.wait_profile.scroll:
+            with self.metrics.stage("scroll"):
+                scroll(browser)
+
+        # Only the readiness wait says how fast the site answers; the scroll takes its time on every page
+        start_time = time.time()
+        try:
+            wait_until(browser, text_ready(HOUSE_FEATURE_X), self.wait_profile.house_features, "house_features")
+        except TimeoutException:
+            self.log_message("Failed to load the RPR page. Reloading...")
+            return False
+        finally:
+            self.rate_limiter.observe(time.time() - start_time, "property page")
+        return True
+
+
+def extract_records(browser, profile=PROFILES["default"], limiter=None):
+    """Read the Deed / Mortgage / Distressed record tabs into {title: {field: value}}."""
+    records = {}
+    for i in range(0, 4):
+        record_xpath = f'//*[@id="mat-tab-group-0-label-{i}"]'
+
+        if element_exists_xpath(browser, record_xpath):
+            element = browser.find_element('xpath', f'//*[@id="mat-tab-group-0-label-{i}"]/span[2]/span')
+            title = element.text.strip()
+
+            if title != 'Tax':
+                show_more_xpath = f'//*[@id="mat-tab-group-0-content-{i}"]/div/rpr-details-table/button'
+
+                next_panel = browser.find_element('xpath', record_xpath)
+
+                if limiter is not None:
+                    limiter.acquire(TAB_CLICK)
+                try:
+                    next_panel.click()
+                except (JavascriptException, ElementNotInteractableException):
+                    return records
+
+                record_history_xpath = f'//*[@id="mat-tab-group-0-content-{i}"]/div/rpr-details-table/div[1]/div[2]/table'
+
+                # Wait for the tab's table to render instead of sleeping
+                try:
+                    wait_until(browser, element_present(record_history_xpath), profile.records_tab, "records_tab")
+                except TimeoutException:
+                    pass
+
+                if element_exists_xpath(browser, show_more_xpath):
+                    show_more = browser.find_element('xpath', show_more_xpath)
+                    try:
+                        show_more.click()
+                    except ElementNotInteractableException:
+                        pass
+
+                fields = read_table(browser, record_history_xpath)
+                if fields:
+                    records[title] = fields
+
+    return records
@@ -1,116 +1,109 @@
-import time
-
-from selenium.webdriver.common.by import By
-from openpyxl.styles import Alignment,Font
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
 from openpyxl import Workbook
 
+from features import HOUSE_FEATURE_SCHEMA
+from page_snapshot import VISIBLE_TEXT_JS
+
+
+# Define titles for each category
+GENERAL_INFOS_TITLES = ["Lowest Estimated Value", "Activity", "Parcel Number", "Owner","Mailing Address","Phone Number","Owner Occupied","Time Owned"]
+# Defined with their labels, aliases and value types in features.py
+HOUSE_FEATURES_TITLES = HOUSE_FEATURE_SCHEMA.titles
+#6
+DEED_TITLES = [
+    "Document #", "Adjustable Rate Index", "Loan Amount (2nd TD)", "Contract Date",
+    "Seller Name", "Rate Change Frequency", "Due Date", "Inter-family Transfer",
+    "Buyer Mailing Address", "Construction Loan", "Title Company Name",
+    "Buyer Name", "Buyer ID",
+    "Buyer Vesting", "Recording Date", "Change Index", "Prepayment Penalty Rider (Term)",
+    "Loan Amount",  "Interest Rate", "Sale Price", "Prepayment Rider", "Lender Name", "Seller ID", "Loan Type",
+    "Max Interest Rate", "Document Type"
+]
+#1
+MORTGAGE_TITLES = [
+    "Document #", "Loan Term Year", "Record Type", "Contract Date",
+    "Rate Change Freq", "Due Date", "Page Number", "Borrower 2 ID", "Equity Credit Line", "Title Company Name",
+    "Construction Loan", "Interest Rate (Not Less)", "Mailing Address", "Type of Financing", "Borrower Mailing Address",
+    "DBA Name", "Recording Date", "Change Index", "Prepayment Penalty Rider (Term)", "Loan Amount", "Lender Type",
+    "Interest Rate", "Prepayment Rider", "Borrower Name", "Book Number", "Vesting Type", "Record Type Code", "Lender Name", "Loan Type", "Borrower ID"
+]
+DISTRESS_TITLES = [
+    "Document #", "Current Beneficiary", "Original Loan Amount", "Contact Name", "Page #", "Source",
+    "Minimum Bid Amount", "Telephone #", "Contract Date", "Attention To", "Past Due Amount", "As Of Date",
+    "Recording Date", "Unpaid Balance", "Case #", "Auction City",
+    "Original Beneficiary Code", "Loan Recording Date",
+    "Auction Location", "Original Beneficiary Lender", "Auction Time", "Contact Address", "Auction Date", "Document Type Code"
+]
+
+
+# Sheet sections in column order: (section name shown in row 1, titles shown in row 2)
+SECTIONS = [
+    ("general infos", GENERAL_INFOS_TITLES),
+    ("house features", HOUSE_FEATURES_TITLES),
+    ("deed", DEED_TITLES),
+    ("mortgage", MORTGAGE_TITLES),
+    ("distress", DISTRESS_TITLES),
+]
+
+# Record tab titles as shown on RPR -> sheet section
+RECORD_TAB_SECTIONS = {"Deed": "deed", "Mortgage": "mortgage", "Distressed": "distress"}
+
+
+class SheetSchema:
+    """Column index for every (section, field) of the results sheet, computed once."""
+
+    address_column = 1
+
+    def __init__(self, sections, first_column=2):
+        self.sections = []
+        self.columns = {}
+        col = first_column
+        for name, titles in sections:
+            self.sections.append((name, col, list(titles)))
+            for title in titles:
+                self.columns[(name, title)] = col
+                col += 1
+        self.max_column = col - 1
+
+    def column(self, section, field):
+        """Return the column for ``field`` in ``section``, or None if the sheet has no such column."""
+        return self.columns.get((section, field))
 
-def create_sheet():
+
+SHEET_SCHEMA = SheetSchema(SECTIONS)
+
+
+CENTER = Alignment(horizontal="center", vertical="center")
+
+
+def register_named_styles(workbook):
+    """Register the shared styles so cells reference one style by name instead of copies."""
+    workbook.add_named_style(NamedStyle(name="rpr_header", font=Font(bold=True), alignment=CENTER))
+    workbook.add_named_style(NamedStyle(name="rpr_center", alignment=CENTER))
+    workbook.add_named_style(NamedStyle(
+        name="rpr_address",
+        fill=PatternFill(start_color="CCFFCC", end_color="CCFFCC", fill_type="solid")
+    ))
+
+
+def create_sheet(schema=SHEET_SCHEMA):
+    """Build the results workbook laid out from ``schema`` and return (workbook, schema)."""
     workbook = Workbook()
+    register_named_styles(workbook)
     sheet = workbook.active
 
-    # Define titles for each category
-    general_infos_titles = ["Lowest Estimated Value", "Activity", "Parcel Number", "Owner","Mailing Address","Phone Number","Owner Occupied","Time Owned"]
-    house_features_titles = [
-    "Property Type",
-    "Bedrooms*",
-    "Total Baths",
-    "Full Baths*",
-    "Building Area (sq ft)",
-    "Living Area (sq ft)*",
-    "Garage (spaces)",
-    "Year Built*"
-]
-    #6
-    deed_titles = [
-        "Document #", "Adjustable Rate Index", "Loan Amount (2nd TD)", "Contract Date",
-        "Seller Name", "Rate Change Frequency", "Due Date", "Inter-family Transfer",
-        "Buyer Mailing Address", "Construction Loan", "Title Company Name",
-        "Buyer Name", "Buyer ID",
-        "Buyer Vesting", "Recording Date", "Change Index", "Prepayment Penalty Rider (Term)",
-        "Loan Amount",  "Interest Rate", "Sale Price", "Prepayment Rider", "Lender Name", "Seller ID", "Loan Type",
-        "Max Interest Rate", "Document Type"
-    ]
-    #1
-    mortgage_titles = [
-        "Document #", "Loan Term Year", "Record Type", "Contract Date",
-        "Rate Change Freq", "Due Date", "Page Number", "Borrower 2 ID", "Equity Credit Line", "Title Company Name",
-        "Construction Loan", "Interest Rate (Not Less)", "Mailing Address", "Type of Financing", "Borrower Mailing Address",
-        "DBA Name", "Recording Date", "Change Index", "Prepayment Penalty Rider (Term)", "Loan Amount", "Lender Type",
-        "Interest Rate", "Prepayment Rider", "Borrower Name", "Book Number", "Vesting Type", "Record Type Code", "Lender Name", "Loan Type", "Borrower ID"
-    ]
-    distress_titles = [
-        "Document #", "Current Beneficiary", "Original Loan Amount", "Contact Name", "Page #", "Source",
-        "Minimum Bid Amount", "Telephone #", "Contract Date", "Attention To", "Past Due Amount", "As Of Date",
-        "Recording Date", "Unpaid Balance", "Case #", "Auction City",
-        "Original Beneficiary Code", "Loan Recording Date",
-        "Auction Location", "Original Beneficiary Lender", "Auction Time", "Contact Address", "Auction Date", "Document Type Code"
-    ]
-
-    # Function to add titles horizontally under the merged cell
-    def add_titles_horizontal(start_row, start_column, titles):
-        col = start_column
-        for title in titles:
-            sheet.cell(row=start_row, column=col).value = title
-            sheet.cell(row=start_row, column=col).alignment = Alignment(horizontal="center", vertical="center")
-            col += 1
-
-
-    # Start the first category "general infos" at column 2
-    sheet.cell(row=1, column=2).value ="Address"
-    sheet.cell(row=1, column=2).alignment = Alignment(horizontal="center", vertical="center")
-    sheet.cell(row=1, column=2).font = Font(bold=True)
-    general_infos_start_col = 2
-    sheet.merge_cells(start_row=1, start_column=general_infos_start_col, end_row=1, end_column=general_infos_start_col + len(general_infos_titles) - 1)  # "general infos"
-    sheet.cell(row=1, column=general_infos_start_col).value = "general infos"
-    sheet.cell(row=1, column=general_infos_start_col).alignment = Alignment(horizontal="center", vertical="center")
-    sheet.cell(row=1, column=general_infos_start_col).font = Font(bold=True)
-
-    # Add general infos titles horizontally under the merged cell
-    add_titles_horizontal(2, general_infos_start_col, general_infos_titles)
-
-    # Start the second category "house features" after general infos
-    house_features_start_col = general_infos_start_col + len(general_infos_titles)
-    sheet.merge_cells(start_row=1, start_column=house_features_start_col, end_row=1, end_column=house_features_start_col + len(house_features_titles) - 1)  # "house features"
-    sheet.cell(row=1, column=house_features_start_col).value = "house features"
-    sheet.cell(row=1, column=house_features_start_col).alignment = Alignment(horizontal="center", vertical="center")
-    sheet.cell(row=1, column=house_features_start_col).font = Font(bold=True)
-
-    # Add house features titles horizontally under the merged cell
-    add_titles_horizontal(2, house_features_start_col, house_features_titles)
-
-    # Start the third category "deed" after house features
-    deed_start_col = house_features_start_col + len(house_features_titles)
-    sheet.merge_cells(start_row=1, start_column=deed_start_col, end_row=1, end_column=deed_start_col + len(deed_titles) - 1)  # "deed"
-    sheet.cell(row=1, column=deed_start_col).value = "deed"
-    sheet.cell(row=1, column=deed_start_col).alignment = Alignment(horizontal="center", vertical="center")
-    sheet.cell(row=1, column=deed_start_col).font = Font(bold=True)
-
-    # Add deed titles horizontally under the merged cell
-    add_titles_horizontal(2, deed_start_col, deed_titles)
-
-    # Start the fourth category "mortgage" after deed
-    mortgage_start_col = deed_start_col + len(deed_titles)
-    sheet.merge_cells(start_row=1, start_column=mortgage_start_col, end_row=1, end_column=mortgage_start_col + len(mortgage_titles) - 1)  # "mortgage"
-    sheet.cell(row=1, column=mortgage_start_col).value = "mortgage"
-    sheet.cell(row=1, column=mortgage_start_col).alignment = Alignment(horizontal="center", vertical="center")
-    sheet.cell(row=1, column=mortgage_start_col).font = Font(bold=True)
-
-    # Add mortgage titles horizontally under the merged cell
-    add_titles_horizontal(2, mortgage_start_col, mortgage_titles)
-
-    # Start the fifth category "distress" after mortgage
-    distress_start_col = mortgage_start_col + len(mortgage_titles)
-    sheet.merge_cells(start_row=1, start_column=distress_start_col, end_row=1, end_column=distress_start_col + len(distress_titles) - 1)  # "distress"
-    sheet.cell(row=1, column=distress_start_col).value = "distress"
-    sheet.cell(row=1, column=distress_start_col).alignment = Alignment(horizontal="center", vertical="center")
-    sheet.cell(row=1, column=distress_start_col).font = Font(bold=True)
-
-    # Add distress titles horizontally under the merged cell
-    add_titles_horizontal(2, distress_start_col, distress_titles)
-
-    # Save the workbook
-    return workbook
+    for name, start_col, titles in schema.sections:
+        # Section name merged across its columns in row 1
+        sheet.merge_cells(start_row=1, start_column=start_col, end_row=1, end_column=start_col + len(titles) - 1)
+        sheet.cell(row=1, column=start_col).value = name
+        sheet.cell(row=1, column=start_col).style = "rpr_header"
+
+        # Field titles horizontally under the merged cell
+        for offset, title in enumerate(titles):
+            sheet.cell(row=2, column=start_col + offset).value = title
+            sheet.cell(row=2, column=start_col + offset).style = "rpr_center"
+
+    return workbook, schema
 
 
 def find_value_in_row(sheet, value, row_number, start_column, end_column):
@@ -137,55 +130,41 @@ def list_to_dict(title_lists):
     return result_dict
 
 
-def append_values_to_sheet(sheet, title_lists, title,r):
+def append_values_to_sheet(sheet, title_lists, title, r, schema=SHEET_SCHEMA):
+    section = RECORD_TAB_SECTIONS.get(title)
+    if section is None:
+        return
 
-    # Get the headers in the first row (titles)
-    headers = {}
-
-    d=list_to_dict(title_lists)
-    c=None
-    for i in d:
-        if title=="Deed":
-            c=find_value_in_row(sheet,i,2,11,49)
-        elif title=="Mortgage":
-            c = find_value_in_row(sheet, i, 2, 46, 83)
-        elif title=="Distressed":
-            c = find_value_in_row(sheet, i, 2, 79, sheet.max_column)
+    d = list_to_dict(title_lists)
+    for field, value in d.items():
+        c = schema.column(section, field)
         if c:
-            sheet.cell(row=r, column=c).value = d[i]
-            sheet.cell(row=r, column=c).alignment = Alignment(horizontal="center", vertical="center")
-
-
-def save_table_to_excel(driver, table_xpath, title, wb,r):
-    # Get the active sheet
-    sheet = wb.active
-    # Extract header (thead)
-    header_row = driver.find_elements(By.XPATH, f"{table_xpath}/thead/tr/th")
-    header_data = [header.text.strip() for header in header_row]
-    # Extract body (tbody)
-    body_rows = driver.find_elements(By.XPATH, f"{table_xpath}/tbody/tr")
-    all_data = [header_data]  # Include header data
-    for row in body_rows:
-        cells = row.find_elements(By.TAG_NAME, "td")
-        row_data = [cell.text.strip() for cell in cells]
-        all_data.append(row_data)
-    # Transpose data (swap rows and columns for horizontal placement)
-    transposed_data = list(map(list, zip(*all_data)))
+            sheet.cell(row=r, column=c).value = value
+            sheet.cell(row=r, column=c).alignment = CENTER
 
-    if not transposed_data:
-        return wb  # Return the workbook unchanged if no data
 
-    # Find the next available column to write data horizontally
+TABLE_JS = VISIBLE_TEXT_JS + """
+const table = document.evaluate(arguments[0], document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!table) { return [[]]; }
+const cells = (row, tag) => [...row.children].filter(c => c.tagName === tag).map(visibleText);
+const header = [...table.querySelectorAll(":scope > thead > tr")].flatMap(tr => cells(tr, "TH"));
+const body = [...table.querySelectorAll(":scope > tbody > tr")].map(tr => cells(tr, "TD"));
+return [header, ...body];
+"""
 
-    append_values_to_sheet(sheet, transposed_data, title,r)
 
-    return wb
+def transpose(rows):
+    """Swap rows and columns (for horizontal placement)."""
+    return list(map(list, zip(*rows)))
 
 
-import pandas as pd
-def read_leads_from_excel(file_path):
-    # Read the Excel file into a DataFrame
-    df = pd.read_excel(file_path, header=None)  # Use `header=None` since there might not be a header row
-    leads = df.iloc[:, 0].dropna().tolist()  # Get the first column, drop NaN, and convert to list
-    return leads
+def read_table(driver, table_xpath):
+    """Read a two-column record table into a {field: value} dict."""
+    # Read header (thead) and body (tbody) cells in a single round trip
+    all_data = driver.execute_script(TABLE_JS, table_xpath)
+    transposed_data = transpose(all_data)
 
+    if len(transposed_data) < 2:
+        return {}
+    return list_to_dict(transposed_data)
@@ -0,0 +1,118 @@
+"""
+Failure classes for leads and the deferred retry queue.
+
+Every failed lead is put in one class. Transient classes go back into the
+run after an exponential backoff, until ``max_attempts`` is used up;
+everything else, and transient failures out of attempts, is final and ends
+up on the Failures sheet.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchWindowException,
+    TimeoutException,
+    WebDriverException,
+)
+
+
+NOT_FOUND = "not_found"
+TIMEOUT = "timeout"
+DIALOG = "dialog"
+SESSION_EXPIRED = "session_expired"
+DRIVER_CRASH = "driver_crash"
+ERROR = "error"
+
+# Worth another attempt later in the run
+TRANSIENT = (TIMEOUT, DIALOG, SESSION_EXPIRED, DRIVER_CRASH, ERROR)
+
+# WebDriverException messages meaning the browser itself is gone
+_CRASH_MESSAGES = ("invalid session id", "chrome not reachable", "disconnected", "target window already closed",
+                   "session deleted", "no such window", "connection refused", "max retries exceeded")
+
+
+class LeadFailure(Exception):
+    """A lead failed in a way the engine recognised; ``failure`` is one of the classes above."""
+
+    def __init__(self, failure, message, stage=None):
+        super().__init__(message)
+        self.failure = failure
+        self.stage = stage
+
+
+def classify(error):
+    """Failure class of an exception raised while processing a lead."""
+    if isinstance(error, LeadFailure):
+        return error.failure
+    if isinstance(error, TimeoutException):
+        return TIMEOUT
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return DRIVER_CRASH
+    if isinstance(error, WebDriverException) and any(m in str(error).lower() for m in _CRASH_MESSAGES):
+        return DRIVER_CRASH
+    return ERROR
+
+
+def describe(error):
+    """First line of an error's message, without selenium's documentation links."""
+    message = error.msg if isinstance(error, WebDriverException) else str(error)
+    message = (message or "").split("; For documentation")[0].strip()
+    return message.splitlines()[0] if message else type(error).__name__
+
+
+class RetryQueue:
+    """Leads waiting for another attempt, released once their backoff has passed.
+
+    The n-th retry of a lead waits ``backoff_base * 2 ** (n - 1)`` seconds
+    (at most ``backoff_max``), with jitter so retries do not arrive together.
+    """
+
+    def __init__(self, max_attempts=3, backoff_base=30.0, backoff_max=600.0):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retried = 0
+
+        self._heap = []
+        self._attempts = {}
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def failed(self, address, failure):
+        """Count a failed attempt; return True when the lead was queued for a retry."""
+        with self._lock:
+            attempts = self._attempts.get(address, 0) + 1
+            self._attempts[address] = attempts
+            if failure not in TRANSIENT or attempts >= self.max_attempts:
+                return False
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+            heapq.heappush(self._heap, (time.time() + delay * random.uniform(0.75, 1.25), next(self._order), address))
+            self.retried += 1
+            return True
+
+    def attempts(self, address):
+        with self._lock:
+            return self._attempts.get(address, 0)
+
+    def pop_due(self):
+        """Leads whose backoff has passed, earliest first."""
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def next_due_in(self):
+        """Seconds until the next retry is due, or None when nothing is waiting."""
+        with self._lock:
+            return max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
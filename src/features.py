@@ -0,0 +1,129 @@
+"""
+House-feature schema and the one-pass parser for the house-features table.
+
+Every feature is defined once: the column title used in the sheet, the
+labels RPR may show for it, the JSON keys used by the network backend and
+the type its value is converted to.
+"""
+
+import re
+
+
+def to_int(text):
+    """ "1,850 sq ft" -> 1850; None when there is no leading number."""
+    match = re.match(r"^-?\d[\d,]*", text)
+    return int(match.group().replace(",", "")) if match else None
+
+
+def to_float(text):
+    """ "2.5" -> 2.5, "3" -> 3; None when there is no leading number."""
+    match = re.match(r"^-?\d[\d,]*(\.\d+)?", text)
+    if not match:
+        return None
+    number = float(match.group().replace(",", ""))
+    return int(number) if number.is_integer() else number
+
+
+class Feature:
+    """One house feature: sheet title, alternative labels, API keys and value converter."""
+
+    def __init__(self, title, aliases=(), api_keys=(), convert=None):
+        self.title = title
+        self.aliases = tuple(aliases)
+        self.api_keys = tuple(api_keys)
+        self.convert = convert
+
+    def value(self, text):
+        """Typed value for the cell text, or the stripped text when it does not convert."""
+        text = str(text).strip()
+        if self.convert is None:
+            return text
+        converted = self.convert(text)
+        return text if converted is None else converted
+
+
+HOUSE_FEATURES = [
+    Feature("Property Type"),
+    Feature("Bedrooms*", ("Bedrooms", "Beds"), ("bedrooms", "beds"), to_int),
+    Feature("Total Baths", ("Bathrooms", "Baths"), ("bathstotal", "bathrooms"), to_float),
+    Feature("Full Baths*", ("Full Baths",), ("bathsfull",), to_int),
+    Feature("Building Area (sq ft)", ("Building Area",), ("buildingarea", "buildingsqft"), to_int),
+    Feature("Living Area (sq ft)*", ("Living Area",), ("livingarea", "livingsqft"), to_int),
+    Feature("Garage (spaces)", ("Garage Spaces", "Garage"), ("garagespaces", "parkingspaces"), to_int),
+    Feature("Year Built*", ("Year Built",), ("yearbuilt",), to_int),
+]
+
+
+# Everything but ASCII letters and digits becomes a space (newlines and tabs separate cells)
+_LABEL_CHARS = str.maketrans({chr(c): " " for c in range(128) if not chr(c).isalnum() and chr(c) not in "\n\t"})
+
+
+def normalize_label(label):
+    """Case, punctuation and asterisk insensitive form of a table label."""
+    return " ".join(label.lower().translate(_LABEL_CHARS).split())
+
+
+def _tokenize(text):
+    """Split table text into cells (one per line or tab) and the normalised label of each.
+
+    The case and punctuation folding is done on the whole text at once.
+    """
+    cells = text.replace("\t", "\n").split("\n")
+    folded = text.lower().translate(_LABEL_CHARS).replace("\t", "\n").split("\n")
+    labels = [" ".join(cell.split()) if "  " in cell else cell.strip() for cell in folded]
+    return cells, labels
+
+
+class FeatureSchema:
+    """Label lookup built once, so parsing cost does not depend on the number of features."""
+
+    def __init__(self, features):
+        self.features = list(features)
+        self.titles = [feature.title for feature in self.features]
+        self.by_title = {feature.title: feature for feature in self.features}
+        self.by_label = {}
+        for feature in self.features:
+            for label in (feature.title,) + feature.aliases:
+                self.by_label.setdefault(normalize_label(label), feature)
+
+    def parse(self, text, wanted=None):
+        """Tokenize table text into label/value pairs in one pass; return {title: value}.
+
+        Cells are separated by newlines or tabs, and a label's value is the
+        cell after it. Only exact (normalised) labels match. A value cell is
+        consumed with its label, so it is never read as a label. A label
+        followed directly by another label has an empty value. ``wanted``
+        limits the result to those titles.
+        """
+        wanted = set(self.titles if wanted is None else wanted)
+        cells, labels = _tokenize(text)
+        by_label = self.by_label
+        result = {}
+        consumed = -1
+        for i in [i for i, label in enumerate(labels) if label in by_label]:
+            if i <= consumed:
+                continue
+            feature = by_label[labels[i]]
+            if i + 1 < len(cells) and labels[i + 1] not in by_label:
+                value = cells[i + 1]
+                consumed = i + 1
+            else:
+                value = ""
+            if feature.title in wanted and feature.title not in result:
+                result[feature.title] = feature.value(value)
+        return result
+
+    def convert(self, values):
+        """Apply each feature's type to a {title: text} dict (e.g. from the network backend)."""
+        return {
+            title: self.by_title[title].value(value) if title in self.by_title else value
+            for title, value in values.items()
+        }
+
+
+HOUSE_FEATURE_SCHEMA = FeatureSchema(HOUSE_FEATURES)
+
+
+def parse_house_features(text, wanted=None):
+    """Parse the house-features table text with the shared schema."""
+    return HOUSE_FEATURE_SCHEMA.parse(text, wanted)
@@ -1,16 +1,16 @@
+import re
+
+from features import parse_house_features
+
+
 def format_house_feature(input_string, features):
-    # Split the input string into lines
-    lines = input_string.strip().split('\n')
+    """Return {feature: value} for the requested feature titles, parsed in one pass."""
+    return parse_house_features(input_string, features)
 
-    # Initialize an empty dictionary to hold the results
-    result_dict = {}
 
-    # Iterate through the list of words
-    for word in features:
-        # Iterate through the lines to find the word
-        for i in range(len(lines) - 1):  # Ensure we don't go out of bounds
-            if word in lines[i]:
-                result_dict[word] = lines[i + 1].strip()  # Store the next line as value
-                break  # Stop searching after finding the first occurrence
+def clean_address(property_address):
+    """Drop blank lines and characters that are not allowed in file names."""
+    property_address = "\n".join(line for line in str(property_address).splitlines() if line.strip())
+    property_address = property_address.strip()
+    return re.sub(r'[\/:*?"<>|]', '_', property_address)
 
-    return result_dict
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""
+Append-only SQLite journal of lead outcomes, used to resume interrupted runs.
+
+Every lead's status (pending, done, not_found, failed), its failure class
+and its extracted record are committed as soon as the lead finishes, so a crash loses at most
+the leads that were in flight. The other input rows that spell the same
+address are journaled too, so the output file (one row per input row, plus
+the Failures sheet) can be rebuilt from the journal alone, without a browser:
+
+    python journal.py leads.journal.sqlite output.xlsx --format xlsx
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, replace
+
+from addresses import LeadGroups
+from output_writer import OUTPUT_FORMATS, FailedLead, LeadRecord, OutputWriter, open_sink
+
+
+PENDING = "pending"
+DONE = "done"
+NOT_FOUND = "not_found"
+FAILED = "failed"
+
+# Statuses that do not need another browser session on resume
+FINISHED = (DONE, NOT_FOUND)
+
+
+class Journal:
+    """Thread-safe lead journal backed by one SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL + FULL sync: every committed lead survives a crash or power loss
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS leads (
+                address TEXT PRIMARY KEY,
+                position INTEGER,
+                status TEXT NOT NULL,
+                record TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL
+            )
+        """)
+        add_failure_columns(self._conn)
+        add_variants_table(self._conn)
+
+    def reset(self):
+        """Forget everything, for a fresh (non-resumed) run."""
+        with self._lock:
+            self._conn.execute("DELETE FROM leads")
+            self._conn.execute("DELETE FROM variants")
+
+    def add_leads(self, addresses):
+        """Register leads as pending after those already added; known leads keep their status."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            start = self._conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM leads").fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO leads (address, position, status, updated_at) VALUES (?, ?, ?, ?)",
+                [(address, start + offset, PENDING, time.time()) for offset, address in enumerate(addresses)]
+            )
+            self._conn.execute("COMMIT")
+
+    def mark_done(self, record):
+        self._update(record.address, DONE, record=json.dumps(asdict(record), ensure_ascii=False))
+
+    def mark_not_found(self, address, stage=None, error=None):
+        self._update(address, NOT_FOUND, error=error, stage=stage)
+
+    def mark_failed(self, address, error, failure=None, stage=None):
+        self._update(address, FAILED, error=str(error), failure=failure, stage=stage)
+
+    def add_variants(self, pairs):
+        """Journal (address, variant) pairs: other input rows that ``address`` was searched for."""
+        with self._lock:
+            store_variants(self._conn, pairs)
+
+    def lead_groups(self):
+        """LeadGroups of the journaled leads, so a rebuild writes one row per input row."""
+        with self._lock:
+            return load_lead_groups(self._conn)
+
+    def pending(self):
+        """Addresses that still need a browser session, in input order."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT address FROM leads WHERE status NOT IN ({','.join('?' * len(FINISHED))}) ORDER BY position",
+                FINISHED
+            ).fetchall()
+        return [address for (address,) in rows]
+
+    def finished(self):
+        """Addresses that do not need another browser session."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT address FROM leads WHERE status IN ({','.join('?' * len(FINISHED))})", FINISHED
+            ).fetchall()
+        return {address for (address,) in rows}
+
+    def record(self, address):
+        """The extracted LeadRecord of ``address``, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM leads WHERE address = ? AND status = ?", (address, DONE)
+            ).fetchone()
+        return LeadRecord(**json.loads(row[0])) if row else None
+
+    def completed_records(self):
+        """Yield the LeadRecord of every lead extracted so far, in input order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM leads WHERE status = ? ORDER BY position", (DONE,)
+            ).fetchall()
+        for (record,) in rows:
+            yield LeadRecord(**json.loads(record))
+
+    def failed_leads(self):
+        """Yield a FailedLead for every lead that failed or was not found, in input order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT address, status, failure, stage, attempts, error FROM leads WHERE status IN (?, ?) "
+                "ORDER BY position",
+                (FAILED, NOT_FOUND)
+            ).fetchall()
+        for row in rows:
+            yield failed_lead(*row)
+
+    def counts(self):
+        """Number of leads per status."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM leads GROUP BY status").fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _update(self, address, status, record=None, error=None, failure=None, stage=None):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO leads (address, status, record, error, failure, stage, attempts, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT(address) DO UPDATE SET
+                    status = excluded.status,
+                    record = excluded.record,
+                    error = excluded.error,
+                    failure = excluded.failure,
+                    stage = excluded.stage,
+                    attempts = leads.attempts + 1,
+                    updated_at = excluded.updated_at
+                """,
+                (address, status, record, error, failure, stage, time.time())
+            )
+
+
+def add_failure_columns(conn):
+    """Journals and queues written before failures were classified lack these columns."""
+    for column in ("failure", "stage"):
+        try:
+            conn.execute(f"ALTER TABLE leads ADD COLUMN {column} TEXT")
+        except sqlite3.OperationalError:
+            pass  # Already there
+
+
+def add_variants_table(conn):
+    """Other input rows with the same address as a lead, written out with its result."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS variants (
+            address TEXT NOT NULL,
+            variant TEXT NOT NULL,
+            PRIMARY KEY (address, variant)
+        )
+    """)
+
+
+def store_variants(conn, pairs):
+    """Insert (address, variant) pairs in one transaction. Caller holds the connection's lock."""
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany("INSERT OR IGNORE INTO variants (address, variant) VALUES (?, ?)", pairs)
+    conn.execute("COMMIT")
+
+
+def load_lead_groups(conn):
+    """LeadGroups restored from the variants table. Caller holds the connection's lock."""
+    rows = conn.execute("SELECT address, variant FROM variants ORDER BY rowid").fetchall()
+    variants = {}
+    for address, variant in rows:
+        variants.setdefault(address, [address]).append(variant)
+    lead_groups = LeadGroups()
+    for address, group in variants.items():
+        lead_groups.add_variants(address, group)
+    return lead_groups
+
+
+def failed_lead(address, status, failure, stage, attempts, error):
+    """FailedLead from a journal or queue row; not-found leads have no failure class stored."""
+    failure = NOT_FOUND if status == NOT_FOUND else failure or FAILED
+    return FailedLead(address, failure, stage or "", attempts, error or "")
+
+
+def write_results(source, writer):
+    """Submit every result and failure of a Journal or WorkQueue to ``writer``, once per input row."""
+    lead_groups = source.lead_groups()
+    for record in source.completed_records():
+        for row in lead_groups.expand(record):
+            writer.submit(row)
+    for failed in source.failed_leads():
+        for variant in lead_groups.variants(failed.address):
+            writer.submit_failure(replace(failed, address=variant))
+
+
+def rebuild_output(journal_path, output_path, output_format="xlsx"):
+    """Write the journal's results to a new output file, as the run itself did. Returns the row count."""
+    journal = Journal(journal_path)
+    writer = OutputWriter(open_sink(output_format, output_path))
+    writer.start()
+    try:
+        write_results(journal, writer)
+    finally:
+        writer.close()
+        journal.close()
+    return writer.rows_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the output file from a run journal.")
+    parser.add_argument("journal")
+    parser.add_argument("output")
+    parser.add_argument("--format", default="xlsx", choices=list(OUTPUT_FORMATS))
+    args = parser.parse_args()
+
+    rows = rebuild_output(args.journal, args.output, args.format)
+    print(f"Wrote {rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
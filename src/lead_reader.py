@@ -0,0 +1,122 @@
+"""
+Streaming lead reader: yields one address per row without loading the file.
+
+xlsx/xlsm files are read with openpyxl in read-only mode, CSV/TSV with the
+csv module and .txt files line by line, so memory stays flat however large
+the lead list is and the first lead is available as soon as it is read.
+Legacy .xls workbooks need xlrd; they are loaded sheet by sheet on demand.
+"""
+
+import csv
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+try:
+    import xlrd
+except ImportError:  # .xls input is optional
+    xlrd = None
+
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+CSV_SUFFIXES = (".csv", ".tsv")
+TEXT_SUFFIXES = (".txt",)
+LEAD_SUFFIXES = EXCEL_SUFFIXES + CSV_SUFFIXES + TEXT_SUFFIXES
+
+# For file dialogs
+LEAD_FILETYPES = [
+    ("Lead files", " ".join(f"*{suffix}" for suffix in LEAD_SUFFIXES)),
+    ("Excel files", "*.xlsx *.xlsm *.xls"),
+    ("CSV files", "*.csv"),
+    ("Text files", "*.txt"),
+    ("All files", "*.*"),
+]
+
+
+def parse_column(column):
+    """CLI value to a column: "3" -> 3 (0-based index), anything else is a header name."""
+    if isinstance(column, str) and column.isdigit():
+        return int(column)
+    return column
+
+
+def read_leads(file_path, sheet=None, column=0):
+    """Yield the non-blank cells of one column of ``file_path``, lazily.
+
+    ``column`` is a 0-based index, or a header name, in which case the first
+    row is the header. ``sheet`` (name, or 0-based index when no sheet has
+    that name; default the first sheet) only applies to Excel files.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".xls":
+        rows = _xls_rows(file_path, sheet)
+    elif suffix in EXCEL_SUFFIXES:
+        rows = _excel_rows(file_path, sheet)
+    elif suffix in CSV_SUFFIXES:
+        rows = _csv_rows(file_path, "\t" if suffix == ".tsv" else ",")
+    elif suffix in TEXT_SUFFIXES:
+        if column != 0:
+            raise ValueError("Text lead files have a single column")
+        rows = _text_rows(file_path)
+    else:
+        raise ValueError(f"Unsupported lead file {file_path}; use one of {', '.join(LEAD_SUFFIXES)}")
+
+    index = column
+    if not isinstance(column, int):
+        header = next(rows, None) or ()
+        names = [str(name).strip() if name is not None else "" for name in header]
+        if column not in names:
+            raise ValueError(f"No column named {column!r} in {file_path}")
+        index = names.index(column)
+
+    for row in rows:
+        value = row[index] if index < len(row) else None
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        yield value
+
+
+def sheet_index(names, sheet, file_path):
+    """Position of ``sheet`` in ``names``: a sheet name first, then a 0-based index ("2019" may be either)."""
+    if str(sheet) in names:
+        return names.index(str(sheet))
+    if isinstance(sheet, int) or str(sheet).isdigit():
+        index = int(sheet)
+        if index < len(names):
+            return index
+    raise ValueError(f"No sheet {sheet!r} in {file_path}; sheets are {', '.join(names)}")
+
+
+def _excel_rows(file_path, sheet):
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        # Like the .xls path (and pandas before), default to the first sheet, not the active one
+        index = 0 if sheet is None else sheet_index(workbook.sheetnames, sheet, file_path)
+        worksheet = workbook.worksheets[index]
+        yield from worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _xls_rows(file_path, sheet):
+    if xlrd is None:
+        raise RuntimeError(".xls lead files need xlrd: pip install xlrd (or save the file as .xlsx)")
+    workbook = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        index = 0 if sheet is None else sheet_index(workbook.sheet_names(), sheet, file_path)
+        worksheet = workbook.sheet_by_index(index)
+        for r in range(worksheet.nrows):
+            yield worksheet.row_values(r)
+    finally:
+        workbook.release_resources()
+
+
+def _csv_rows(file_path, delimiter):
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f, delimiter=delimiter)
+
+
+def _text_rows(file_path):
+    with open(file_path, encoding="utf-8-sig") as f:
+        for line in f:
+            yield (line.rstrip("\r\n"),)
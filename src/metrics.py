@@ -0,0 +1,301 @@
+"""
+Per-stage timing and WebDriver command counts, exported as JSON and Prometheus text.
+
+Workers wrap each lead in ``metrics.lead(address)`` and each step in
+``metrics.stage(name)``. Drivers passed to ``instrument()`` count every
+WebDriver command against the stage running on the calling thread. Stage
+durations go into fixed-bucket histograms; leads slower than ``slow_lead``
+seconds are logged and kept with their stage breakdown. Counters (e.g. bytes
+transferred) and per-browser figures from ``worker()`` are exported too.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Histogram bucket upper bounds in seconds (+Inf is implicit)
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        """(le, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(BUCKETS) + ["+Inf"], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class LeadTrace:
+    """Stage breakdown of one lead: {stage: [seconds, commands]}."""
+
+    def __init__(self, address):
+        self.address = address
+        self.started = time.time()
+        self.stages = {}
+
+    def add(self, stage, seconds, commands):
+        totals = self.stages.setdefault(stage, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += commands
+
+    def breakdown(self):
+        return ", ".join(
+            f"{stage} {seconds:.1f}s/{commands} cmds"
+            for stage, (seconds, commands) in sorted(self.stages.items(), key=lambda item: -item[1][0])
+        )
+
+
+class RunMetrics:
+    """Collects stage spans for one run and exports them on an interval and at close()."""
+
+    def __init__(self, slow_lead=60, export_dir=None, export_interval=60, log=print, keep_slow=100):
+        self.slow_lead = slow_lead
+        self.export_dir = export_dir
+        self.export_interval = export_interval
+        self.log = log
+        self.keep_slow = keep_slow
+
+        self.stages = {}
+        self.commands = {}
+        self.leads = Histogram()
+        self.outcomes = {}
+        self.slow_leads = []
+        self.counters = {}
+        self.workers = {}
+        self.started = time.time()
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Stage stacks by thread, so the watchdog can tell where another thread is stuck
+        self._stacks = {}
+        self._stop = threading.Event()
+        self._exporter = None
+
+    def start(self):
+        """Export every ``export_interval`` seconds until close()."""
+        if self.export_dir and self.export_interval:
+            self._exporter = threading.Thread(target=self._export_loop, daemon=True)
+            self._exporter.start()
+
+    def close(self):
+        """Stop periodic exports and write the final ones."""
+        self._stop.set()
+        if self._exporter is not None:
+            self._exporter.join()
+        if self.export_dir:
+            self.export()
+
+    def instrument(self, driver):
+        """Count every WebDriver command ``driver`` sends against the current stage."""
+        execute = driver.execute
+
+        def counted_execute(driver_command, params=None):
+            stack = getattr(self._local, "stack", None)
+            if stack:
+                stack[-1][1] += 1
+            return execute(driver_command, params)
+
+        driver.execute = counted_execute
+        return driver
+
+    @contextmanager
+    def lead(self, address):
+        """Trace one lead; the yielded dict takes its "outcome" before the block ends."""
+        trace = LeadTrace(address)
+        self._local.trace = trace
+        self._local.failed_stage = None
+        result = {"outcome": "ok"}
+        try:
+            yield result
+        finally:
+            self._local.trace = None
+            elapsed = time.time() - trace.started
+            with self._lock:
+                self.leads.observe(elapsed)
+                self.outcomes[result["outcome"]] = self.outcomes.get(result["outcome"], 0) + 1
+                slow = elapsed >= self.slow_lead
+                if slow:
+                    self.slow_leads.append({
+                        "address": address,
+                        "seconds": round(elapsed, 2),
+                        "outcome": result["outcome"],
+                        "stages": {s: {"seconds": round(v[0], 2), "commands": v[1]} for s, v in trace.stages.items()},
+                    })
+                    del self.slow_leads[:-self.keep_slow]
+            if slow:
+                self.log(f"Slow lead {address}: {elapsed:.1f}s ({trace.breakdown()})")
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage and count the WebDriver commands issued during it."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            with self._lock:
+                self._stacks[threading.get_ident()] = stack
+        frame = [name, 0]
+        stack.append(frame)
+        start = time.time()
+        try:
+            yield
+        except BaseException:
+            # The innermost stage an error went through is where the lead failed
+            if getattr(self._local, "failed_stage", None) is None:
+                self._local.failed_stage = name
+            raise
+        finally:
+            elapsed = time.time() - start
+            stack.pop()
+            with self._lock:
+                self.stages.setdefault(name, Histogram()).observe(elapsed)
+                self.commands[name] = self.commands.get(name, 0) + frame[1]
+            trace = getattr(self._local, "trace", None)
+            if trace is not None:
+                trace.add(name, elapsed, frame[1])
+
+    def count(self, name, amount=1):
+        """Add ``amount`` to a run-wide counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def worker(self, name, rss_mb=None, bytes_transferred=0):
+        """Record one finished lead of browser ``name``: its current RSS and the bytes the lead downloaded."""
+        with self._lock:
+            stats = self.workers.setdefault(name, {"leads": 0, "bytes": 0, "rss_mb": None, "peak_rss_mb": None})
+            stats["leads"] += 1
+            stats["bytes"] += bytes_transferred
+            if rss_mb is not None:
+                stats["rss_mb"] = round(rss_mb, 1)
+                stats["peak_rss_mb"] = max(stats["peak_rss_mb"] or 0.0, stats["rss_mb"])
+
+    def worker_summary(self):
+        """One line on memory and traffic per browser, or None before any lead finished."""
+        with self._lock:
+            workers = [dict(stats) for stats in self.workers.values()]
+        if not workers:
+            return None
+        peaks = [stats["peak_rss_mb"] for stats in workers if stats["peak_rss_mb"] is not None]
+        leads = sum(stats["leads"] for stats in workers)
+        total = sum(stats["bytes"] for stats in workers)
+        memory = (f"RSS per browser {sum(peaks) / len(peaks):.0f} MB avg, {max(peaks):.0f} MB max"
+                  if peaks else "RSS unknown")
+        return (f"Browsers: {len(workers)} sessions, {memory}; "
+                f"{total / 2 ** 20:.1f} MB transferred, {total / leads / 1024:.0f} KB per lead")
+
+    def failed_stage(self):
+        """Stage the current lead of this thread failed in, if an error went through one."""
+        return getattr(self._local, "failed_stage", None)
+
+    def current_stage(self, thread_id):
+        """Innermost stage thread ``thread_id`` is in right now, or None."""
+        frames = list(self._stacks.get(thread_id, ()))
+        return frames[-1][0] if frames else None
+
+    def snapshot(self):
+        """Everything collected so far as a JSON-friendly dict."""
+        with self._lock:
+            return {
+                "elapsed_s": round(time.time() - self.started, 2),
+                "leads": self._histogram_dict(self.leads),
+                "outcomes": dict(self.outcomes),
+                "stages": {
+                    name: dict(self._histogram_dict(histogram), commands=self.commands.get(name, 0))
+                    for name, histogram in self.stages.items()
+                },
+                "slow_leads": list(self.slow_leads),
+                "counters": dict(self.counters),
+                "workers": {name: dict(stats) for name, stats in self.workers.items()},
+            }
+
+    def prometheus(self):
+        """Prometheus text exposition format of the histograms and counters."""
+        lines = [
+            "# HELP rpr_stage_seconds Time spent per pipeline stage.",
+            "# TYPE rpr_stage_seconds histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.stages.items()):
+                lines += self._histogram_lines("rpr_stage_seconds", histogram, f'stage="{name}",')
+            lines += [
+                "# HELP rpr_stage_webdriver_commands_total WebDriver commands issued per stage.",
+                "# TYPE rpr_stage_webdriver_commands_total counter",
+            ]
+            for name, count in sorted(self.commands.items()):
+                lines.append(f'rpr_stage_webdriver_commands_total{{stage="{name}"}} {count}')
+            lines += ["# HELP rpr_lead_seconds Time per lead.", "# TYPE rpr_lead_seconds histogram"]
+            lines += self._histogram_lines("rpr_lead_seconds", self.leads, "")
+            lines += ["# HELP rpr_leads_total Leads processed by outcome.", "# TYPE rpr_leads_total counter"]
+            for outcome, count in sorted(self.outcomes.items()):
+                lines.append(f'rpr_leads_total{{outcome="{outcome}"}} {count}')
+            for name, value in sorted(self.counters.items()):
+                lines += [f"# TYPE rpr_{name}_total counter", f"rpr_{name}_total {value}"]
+            lines += ["# HELP rpr_worker_rss_mb Resident memory of each browser (chromedriver and Chrome).",
+                      "# TYPE rpr_worker_rss_mb gauge"]
+            for name, stats in sorted(self.workers.items()):
+                if stats["rss_mb"] is not None:
+                    lines.append(f'rpr_worker_rss_mb{{worker="{name}"}} {stats["rss_mb"]}')
+            lines += ["# HELP rpr_worker_bytes_total Bytes downloaded by each browser.",
+                      "# TYPE rpr_worker_bytes_total counter"]
+            for name, stats in sorted(self.workers.items()):
+                lines.append(f'rpr_worker_bytes_total{{worker="{name}"}} {stats["bytes"]}')
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """Write metrics.json and metrics.prom to ``export_dir``, atomically."""
+        os.makedirs(self.export_dir, exist_ok=True)
+        for name, content in (("metrics.json", json.dumps(self.snapshot(), indent=2)),
+                              ("metrics.prom", self.prometheus())):
+            path = os.path.join(self.export_dir, name)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+
+    def _export_loop(self):
+        while not self._stop.wait(self.export_interval):
+            try:
+                self.export()
+            except OSError as e:
+                self.log(f"Failed to export metrics: {e}")
+
+    @staticmethod
+    def _histogram_dict(histogram):
+        return {
+            "count": histogram.count,
+            "sum_s": round(histogram.sum, 3),
+            "max_s": round(histogram.max, 3),
+            "buckets": {str(le): count for le, count in histogram.cumulative()},
+        }
+
+    @staticmethod
+    def _histogram_lines(metric, histogram, labels):
+        lines = [f'{metric}_bucket{{{labels}le="{le}"}} {count}' for le, count in histogram.cumulative()]
+        labels = labels.rstrip(",")
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{metric}_sum{suffix} {histogram.sum:.3f}")
+        lines.append(f"{metric}_count{suffix} {histogram.count}")
+        return lines
@@ -0,0 +1,205 @@
+"""
+Micro-benchmarks for the pure-Python hot paths, no Chrome or network needed.
+
+Each case runs on synthetic inputs at 1x (a realistic lead), 10x and 100x
+scale. Results can be saved as a baseline and later runs compared to it:
+
+    python microbench.py --save-baseline
+    python microbench.py --check            # exit code 1 on a regression
+    python microbench.py --check --threshold 0.5 --only save
+
+The baseline is machine specific; record it on the machine that checks it.
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+from excel_helpers import (
+    DEED_TITLES, HOUSE_FEATURES_TITLES, SECTIONS, SheetSchema,
+    append_values_to_sheet, create_sheet, find_value_in_row, list_to_dict, transpose
+)
+from formatting import format_house_feature
+from output_writer import LeadRecord, write_record
+
+
+SCALES = (1, 10, 100)
+DEFAULT_BASELINE = Path(__file__).with_name("microbench_baseline.json")
+
+
+def house_features_text(scale):
+    """Label/value lines as read from the house-features table, ~30 features per 1x."""
+    lines = []
+    for i in range(30 * scale):
+        lines += [f"Feature {i}", f"Value {i}"]
+    # The requested features sit at the end so every scan goes through the whole block
+    for title in HOUSE_FEATURES_TITLES:
+        lines += [title, "3"]
+    return "\n".join(lines)
+
+
+def record_table(scale, titles=DEED_TITLES):
+    """[header, row...] as returned by TABLE_JS for a record tab, widened with extra fields."""
+    fields = list(titles) + [f"Extra field {i}" for i in range(len(titles) * (scale - 1))]
+    return [["Name", "Details"]] + [[field, f"value {i}"] for i, field in enumerate(fields)]
+
+
+def wide_sheet(scale):
+    workbook, _ = create_sheet()
+    sheet = workbook.active
+    width = 100 * scale
+    for col in range(1, width + 1):
+        sheet.cell(row=3, column=col).value = f"cell {col}"
+    return sheet, width
+
+
+def sample_record(i):
+    return LeadRecord(
+        address=f"{i} Benchmark Ave",
+        estimate="$412,000",
+        activity="Listed 01/02/2020",
+        parcel=str(100000 + i),
+        owner="Jane Doe",
+        owner_facts={"Mailing Address": "1 Main St", "Owner Occupied": "Yes"},
+        house_features={title: "3" for title in HOUSE_FEATURES_TITLES},
+        records={"Deed": {title: "x" for title in DEED_TITLES}},
+    )
+
+
+def scaled_schema(scale):
+    return SheetSchema([(name, [f"{t} {k}" if k else t for k in range(scale) for t in titles])
+                        for name, titles in SECTIONS])
+
+
+def saved_workbook(rows):
+    workbook, schema = create_sheet()
+    sheet = workbook.active
+    for i in range(rows):
+        write_record(sheet, i + 3, sample_record(i), schema)
+    return workbook
+
+
+def build_cases(scale):
+    """Return {name: setup} for one scale; setup() builds the inputs and returns the timed callable."""
+    def format_case():
+        text = house_features_text(scale)
+        return lambda: format_house_feature(text, HOUSE_FEATURES_TITLES)
+
+    def find_case():
+        sheet, width = wide_sheet(scale)
+        return lambda: find_value_in_row(sheet, f"cell {width}", 3, 1, width)
+
+    def list_to_dict_case():
+        columns = transpose(record_table(scale))
+        return lambda: list_to_dict(columns)
+
+    def append_case():
+        columns = transpose(record_table(scale))
+        workbook, _ = create_sheet()
+        return lambda: append_values_to_sheet(workbook.active, columns, "Deed", 3)
+
+    def transpose_case():
+        table = record_table(scale)
+        return lambda: transpose(table)
+
+    def create_sheet_case():
+        schema = scaled_schema(scale)
+        return lambda: create_sheet(schema)
+
+    def save_case():
+        workbook = saved_workbook(100 * scale)
+        return lambda: workbook.save(io.BytesIO())
+
+    return {
+        "format_house_feature": format_case,
+        "find_value_in_row": find_case,
+        "list_to_dict": list_to_dict_case,
+        "append_values_to_sheet": append_case,
+        "transpose": transpose_case,
+        "create_sheet": create_sheet_case,
+        "save": save_case,
+    }
+
+
+def measure(func, min_time=0.2, repeat=3):
+    """Best per-call time in seconds over ``repeat`` batches of at least ``min_time`` each."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run(only=None, min_time=0.2, repeat=3):
+    """Return {"case@scale": seconds per call}."""
+    results = {}
+    for scale in SCALES:
+        for name, setup in build_cases(scale).items():
+            if only and not any(part in name for part in only):
+                continue
+            results[f"{name}@{scale}x"] = measure(setup(), min_time, repeat)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return (lines, regressed) comparing results with the baseline."""
+    lines = []
+    regressed = False
+    for key, seconds in results.items():
+        line = f"{key:32s} {seconds * 1e6:12.1f} us"
+        if key in baseline:
+            ratio = seconds / baseline[key]
+            line += f"   x{ratio:.2f} vs baseline"
+            if ratio > 1 + threshold:
+                line += "   REGRESSION"
+                regressed = True
+        lines.append(line)
+    return lines, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the pure-Python hot paths.")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Fail when slower than the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--only", nargs="*", help="Run only cases whose name contains one of these")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = run(args.only, args.min_time, args.repeat)
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    lines, regressed = compare(results, baseline, args.threshold)
+    print("\n".join(lines))
+
+    if args.save_baseline:
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"Baseline saved to {baseline_path}")
+
+    if args.check and regressed:
+        print(f"Slower than baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Network-capture extraction backend.
+
+Instead of scraping the rendered DOM, an interceptor injected before any page
+script runs records the JSON bodies of the site's XHR/fetch responses. Those
+payloads are then mapped onto the same fields the DOM extractors produce.
+"""
+
+import json
+import re
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from excel_helpers import (
+    DEED_TITLES,
+    DISTRESS_TITLES,
+    GENERAL_INFOS_TITLES,
+    HOUSE_FEATURES_TITLES,
+    MORTGAGE_TITLES,
+)
+from features import HOUSE_FEATURE_SCHEMA, HOUSE_FEATURES
+
+
+# Only responses from these URLs are kept; everything else is ignored. The
+# pattern is matched against the absolute URL, since the app requests /api/... paths
+CAPTURE_URL_PATTERN = r"narrpr\.com/.*(api|propert)"
+
+INTERCEPTOR_JS = r"""
+(function () {
+    if (window.__rprCaptured) { return; }
+    window.__rprCaptured = [];
+    window.__rprPending = 0;
+    window.__rprLastActivity = Date.now();
+    const pattern = new RegExp(%s, "i");
+
+    function absolute(url) {
+        try { return new URL(String(url), location.href).href; } catch (e) { return String(url); }
+    }
+    function keep(url, text) {
+        if (!pattern.test(url)) { return; }
+        try {
+            window.__rprCaptured.push({url: url, body: JSON.parse(text)});
+        } catch (e) { /* not JSON */ }
+    }
+    function started() { window.__rprPending++; window.__rprLastActivity = Date.now(); }
+    function finished() { window.__rprPending--; window.__rprLastActivity = Date.now(); }
+
+    const open = XMLHttpRequest.prototype.open;
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__rprUrl = String(url);
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function () {
+        started();
+        this.addEventListener("loadend", () => {
+            if (this.responseType === "" || this.responseType === "text") {
+                keep(this.responseURL || absolute(this.__rprUrl), this.responseText);
+            } else if (this.responseType === "json" && this.response) {
+                keep(this.responseURL || absolute(this.__rprUrl), JSON.stringify(this.response));
+            }
+            finished();
+        });
+        return send.apply(this, arguments);
+    };
+
+    const fetch = window.fetch;
+    window.fetch = function (input) {
+        const url = absolute(input instanceof Request ? input.url : input);
+        started();
+        return fetch.apply(this, arguments).then((response) => {
+            response.clone().text().then((text) => keep(response.url || url, text)).finally(finished);
+            return response;
+        }, (error) => { finished(); throw error; });
+    };
+})();
+""" % json.dumps(CAPTURE_URL_PATTERN)
+
+# Only the property details responses are mapped; session, search and
+# suggestion calls are captured too and carry unrelated "status"-like fields
+DETAILS_URL_PATTERN = r"/propert(y|ies)/"
+
+# JSON keys (compared lower-cased, without punctuation) for the single-value fields.
+# Keys as generic as "status" or "owner" are left out: they match nested objects too
+FIELD_KEYS = {
+    "estimate": ("rvmlow", "estimatedvaluelow", "avmlow", "lowvalue", "valuelow"),
+    "activity": ("activity", "lastactivity", "listingstatus"),
+    "parcel": ("parcelnumber", "parcelid"),
+    "owner": ("ownername", "owner1fullname", "ownerfullname"),
+}
+
+# Extra keys for columns whose titles do not normalise to the API key
+COLUMN_ALIASES = {
+    "Phone Number": ("phone", "ownerphone"),
+    "Time Owned": ("lengthofownership", "yearsowned"),
+}
+COLUMN_ALIASES.update({feature.title: feature.api_keys for feature in HOUSE_FEATURES})
+
+# Record tab title -> (JSON collection keys, column titles)
+RECORD_SECTIONS = {
+    "Deed": (("deeds", "deed", "deedhistory"), DEED_TITLES),
+    "Mortgage": (("mortgages", "mortgage", "mortgagehistory"), MORTGAGE_TITLES),
+    "Distressed": (("distressed", "distress", "foreclosures", "preforeclosures"), DISTRESS_TITLES),
+}
+
+
+def install_interceptor(driver):
+    """Register the capture script so it runs before the page's own scripts on every load."""
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": INTERCEPTOR_JS})
+
+
+def wait_for_payloads(driver, timeout=25, quiet_ms=500):
+    """Wait until something was captured and no request has been in flight for ``quiet_ms``."""
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script(
+        "return !!window.__rprCaptured && window.__rprCaptured.length > 0"
+        " && window.__rprPending <= 0"
+        " && Date.now() - window.__rprLastActivity > arguments[0];",
+        quiet_ms
+    ))
+
+
+def clear_payloads(driver):
+    """Drop what the current document captured so far (home page calls, an earlier search)."""
+    driver.execute_script(
+        "if (window.__rprCaptured) { window.__rprCaptured.length = 0; window.__rprLastActivity = Date.now(); }"
+    )
+
+
+def collect_payloads(driver):
+    """Return and clear every payload captured on the current page."""
+    return driver.execute_script(
+        "return window.__rprCaptured ? window.__rprCaptured.splice(0) : [];"
+    )
+
+
+def extract_lead_data(driver, timeout=25):
+    """Wait for the details responses and map them to lead fields, or None if none arrived."""
+    try:
+        wait_for_payloads(driver, timeout)
+    except TimeoutException:
+        return None
+    return map_payloads(collect_payloads(driver))
+
+
+def map_payloads(payloads):
+    """Map the captured property details bodies onto the fields produced by the DOM extractors.
+
+    Returns None when none of ``payloads`` came from a property details URL.
+    """
+    details = [payload for payload in payloads
+               if re.search(DETAILS_URL_PATTERN, payload.get("url") or "", re.IGNORECASE)]
+    if not details:
+        return None
+
+    index = {}
+    collections = {}
+    for payload in details:
+        _index_json(payload.get("body"), index, collections)
+
+    data = {name: _first(index, keys, "") for name, keys in FIELD_KEYS.items()}
+    if not data["estimate"]:
+        data["estimate"] = "No closed price available."
+
+    data["owner_facts"] = _map_columns(index, GENERAL_INFOS_TITLES[4:])
+    data["house_features"] = HOUSE_FEATURE_SCHEMA.convert(_map_columns(index, HOUSE_FEATURES_TITLES))
+
+    records = {}
+    for title, (collection_keys, titles) in RECORD_SECTIONS.items():
+        entry = _first(collections, collection_keys, None)
+        if entry:
+            entry_index = {}
+            _index_json(entry, entry_index, {})
+            records[title] = _map_columns(entry_index, titles)
+    data["records"] = records
+    return data
+
+
+def _key(name):
+    """Normalise a JSON key or column title for comparison."""
+    return re.sub(r"[^a-z0-9]", "", str(name).lower().replace("#", "number"))
+
+
+def _index_json(node, index, collections):
+    """Flatten a JSON tree into first-seen leaf values and first items of lists of objects."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            normalised = _key(key)
+            if isinstance(value, (dict, list)):
+                if isinstance(value, list) and value and isinstance(value[0], dict):
+                    collections.setdefault(normalised, value[0])
+                _index_json(value, index, collections)
+            elif value not in (None, "") and normalised not in index:
+                index[normalised] = str(value)
+    elif isinstance(node, list):
+        for item in node:
+            _index_json(item, index, collections)
+
+
+def _first(index, keys, default):
+    for key in keys:
+        if key in index:
+            return index[key]
+    return default
+
+
+def _map_columns(index, titles):
+    result = {}
+    for title in titles:
+        value = _first(index, (_key(title),) + COLUMN_ALIASES.get(title, ()), None)
+        if value is not None:
+            result[title] = value
+    return result
@@ -0,0 +1,433 @@
+"""
+Single writer thread that owns the output file.
+
+Extraction workers only build immutable LeadRecord objects and submit them;
+the writer assigns rows, hands them to an output sink and flushes it on a
+time or count interval plus once at shutdown. Leads that failed for good
+are submitted as FailedLead and go to a separate Failures sheet (or a
+``.failures`` file next to flat outputs).
+"""
+
+import csv
+import json
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+from excel_helpers import RECORD_TAB_SECTIONS, SHEET_SCHEMA, create_sheet, register_named_styles
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+
+@dataclass(frozen=True)
+class LeadRecord:
+    """Everything extracted for one property, independent of how it was extracted."""
+    address: str
+    estimate: str = ""
+    activity: str = ""
+    parcel: str = ""
+    owner: str = None
+    owner_facts: dict = field(default_factory=dict)
+    house_features: dict = field(default_factory=dict)
+    records: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class FailedLead:
+    """A lead given up on: its failure class, the stage it failed in and the last error."""
+    address: str
+    failure: str
+    stage: str = ""
+    attempts: int = 1
+    error: str = ""
+
+
+FAILURE_HEADERS = ["Address", "Failure", "Stage", "Attempts", "Error"]
+
+
+def failure_row(failed):
+    return [failed.address, failed.failure, failed.stage, failed.attempts, failed.error]
+
+
+def failures_path(file_path, extension):
+    """``out/run.csv`` -> ``out/run.failures.csv``."""
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.stem}.failures{extension}")
+
+
+def display_estimate(estimate):
+    """Estimate text as shown in the sheet."""
+    try:
+        lowest = estimate.strip()
+    except (IndexError, AttributeError):
+        lowest = estimate
+
+    if lowest == "No closed price available.":
+        lowest = "RPR price is not available"
+    return lowest
+
+
+def record_cells(record, schema=SHEET_SCHEMA):
+    """Yield (column, value, named style) for every cell of a lead's row."""
+    yield schema.address_column, record.address, "rpr_address"
+
+    # General infos and owner facts
+    general = {
+        "Lowest Estimated Value": display_estimate(record.estimate),
+        "Activity": record.activity,
+        "Parcel Number": record.parcel,
+        "Owner": record.owner,
+    }
+    general.update(record.owner_facts)
+    for label, value in general.items():
+        col = schema.column("general infos", label)
+        if col:
+            yield col, value, None
+
+    # House features
+    for feature, value in record.house_features.items():
+        col = schema.column("house features", feature)
+        if col:
+            yield col, value, None
+
+    # Deed / Mortgage / Distressed sections
+    for title, fields in record.records.items():
+        section = RECORD_TAB_SECTIONS.get(title)
+        for label, value in fields.items():
+            col = schema.column(section, label)
+            if col:
+                yield col, value, "rpr_center"
+
+
+def record_row(record, schema=SHEET_SCHEMA):
+    """Return a lead as a dense list of cell values, column 1 first."""
+    row = [None] * schema.max_column
+    for col, value, _ in record_cells(record, schema):
+        row[col - 1] = value
+    return row
+
+
+def flat_headers(schema=SHEET_SCHEMA):
+    """Unique single-row column names ("section: field") for flat formats."""
+    headers = ["Address"] * schema.max_column
+    for name, start_col, titles in schema.sections:
+        for offset, title in enumerate(titles):
+            headers[start_col - 1 + offset] = f"{name}: {title}"
+    return headers
+
+
+def write_record(sheet, row, record, schema=SHEET_SCHEMA):
+    """Write one lead to ``row`` of a sheet created by create_sheet()."""
+    for col, value, style in record_cells(record, schema):
+        cell = sheet.cell(row=row, column=col)
+        cell.value = value
+        if style:
+            cell.style = style
+
+
+class WorkbookSink:
+    """Regular in-memory workbook, re-saved as a whole on every flush."""
+
+    def __init__(self, file_path, schema=SHEET_SCHEMA):
+        self.file_path = Path(file_path)
+        self.schema = schema
+        self.workbook, _ = create_sheet(schema)
+        self.sheet = self.workbook.active
+        self._next_row = self.sheet.max_row + 1
+        self.failures = None
+
+    def write(self, record):
+        write_record(self.sheet, self._next_row, record, self.schema)
+        self._next_row += 1
+
+    def write_failure(self, failed):
+        if self.failures is None:
+            self.failures = self.workbook.create_sheet("Failures")
+            self.failures.append(FAILURE_HEADERS)
+            for cell in self.failures[1]:
+                cell.style = "rpr_center"
+        self.failures.append(failure_row(failed))
+
+    def flush(self):
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.workbook.save(self.file_path)
+
+    def close(self):
+        self.flush()
+
+
+class StreamingWorkbookSink:
+    """openpyxl write-only workbook: rows stream to disk, memory stays flat.
+
+    Same two header rows as create_sheet(). A write-only workbook can only be
+    saved once, so flush() is a no-op and the file appears at close().
+    """
+
+    def __init__(self, file_path, schema=SHEET_SCHEMA):
+        self.file_path = Path(file_path)
+        self.schema = schema
+        self.workbook = Workbook(write_only=True)
+        register_named_styles(self.workbook)
+        self.sheet = self.workbook.create_sheet()
+
+        section_row = [None] * schema.max_column
+        title_row = [None] * schema.max_column
+        for name, start_col, titles in schema.sections:
+            section_row[start_col - 1] = self._cell(name, "rpr_header")
+            for offset, title in enumerate(titles):
+                title_row[start_col - 1 + offset] = self._cell(title, "rpr_center")
+            self.sheet.merged_cells.add(
+                f"{get_column_letter(start_col)}1:{get_column_letter(start_col + len(titles) - 1)}1"
+            )
+        self.sheet.append(section_row)
+        self.sheet.append(title_row)
+        self.failures = None
+
+    def _cell(self, value, style=None):
+        cell = WriteOnlyCell(self.sheet, value=value)
+        if style:
+            cell.style = style
+        return cell
+
+    def write(self, record):
+        row = [None] * self.schema.max_column
+        for col, value, style in record_cells(record, self.schema):
+            row[col - 1] = self._cell(value, style) if style else value
+        self.sheet.append(row)
+
+    def write_failure(self, failed):
+        if self.failures is None:
+            self.failures = self.workbook.create_sheet("Failures")
+            self.failures.append([self._cell(title, "rpr_center") for title in FAILURE_HEADERS])
+        self.failures.append(failure_row(failed))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.workbook.save(self.file_path)
+
+
+class FailuresCsv:
+    """The ``.failures.csv`` file next to a flat output, created on the first failure."""
+
+    def __init__(self, file_path):
+        self.file_path = failures_path(file_path, ".csv")
+        self._file = None
+
+    def write(self, failed):
+        if self._file is None:
+            self._file = open(self.file_path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(FAILURE_HEADERS)
+        self._writer.writerow(failure_row(failed))
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class CsvSink:
+    """One CSV line per lead with "section: field" headers, appended as we go."""
+
+    def __init__(self, file_path, schema=SHEET_SCHEMA):
+        self.schema = schema
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(file_path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(flat_headers(schema))
+        self._failures = FailuresCsv(file_path)
+
+    def write(self, record):
+        self._writer.writerow(record_row(record, self.schema))
+
+    def write_failure(self, failed):
+        self._failures.write(failed)
+
+    def flush(self):
+        self._file.flush()
+        self._failures.flush()
+
+    def close(self):
+        self._file.close()
+        self._failures.close()
+
+
+class JsonlSink:
+    """One JSON object per lead, as extracted."""
+
+    def __init__(self, file_path, schema=SHEET_SCHEMA):
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(file_path, "w", encoding="utf-8")
+        self._failures_path = failures_path(file_path, ".jsonl")
+        self._failures = None
+
+    def write(self, record):
+        self._file.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+    def write_failure(self, failed):
+        if self._failures is None:
+            self._failures = open(self._failures_path, "w", encoding="utf-8")
+        self._failures.write(json.dumps(asdict(failed), ensure_ascii=False) + "\n")
+
+    def flush(self):
+        self._file.flush()
+        if self._failures is not None:
+            self._failures.flush()
+
+    def close(self):
+        self._file.close()
+        if self._failures is not None:
+            self._failures.close()
+
+
+class ParquetSink:
+    """Parquet file with one string column per sheet column, written a row group per flush."""
+
+    def __init__(self, file_path, schema=SHEET_SCHEMA):
+        if pa is None:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+        self.schema = schema
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        self._arrow_schema = pa.schema([(name, pa.string()) for name in flat_headers(schema)])
+        self._writer = pq.ParquetWriter(str(file_path), self._arrow_schema)
+        self._rows = []
+        self._failures = FailuresCsv(file_path)
+
+    def write(self, record):
+        self._rows.append([None if v is None else str(v) for v in record_row(record, self.schema)])
+
+    def write_failure(self, failed):
+        self._failures.write(failed)
+
+    def flush(self):
+        if not self._rows:
+            return
+        columns = list(zip(*self._rows))
+        self._writer.write_table(pa.Table.from_arrays(
+            [pa.array(column, pa.string()) for column in columns], schema=self._arrow_schema
+        ))
+        self._rows = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+        self._failures.close()
+
+
+# Output format -> (sink class, file extension)
+OUTPUT_FORMATS = {
+    "xlsx": (WorkbookSink, ".xlsx"),
+    "xlsx-stream": (StreamingWorkbookSink, ".xlsx"),
+    "csv": (CsvSink, ".csv"),
+    "jsonl": (JsonlSink, ".jsonl"),
+    "parquet": (ParquetSink, ".parquet"),
+}
+
+
+def open_sink(output_format, file_path, schema=SHEET_SCHEMA):
+    """Create the sink for ``output_format`` (a key of OUTPUT_FORMATS)."""
+    sink_class, _ = OUTPUT_FORMATS[output_format]
+    return sink_class(file_path, schema)
+
+
+class OutputWriter(threading.Thread):
+    """Owns ``sink``; call submit() from any thread and close() once at the end."""
+
+    _STOP = object()
+
+    def __init__(self, sink, flush_every=50, flush_interval=30.0, log=print, metrics=None):
+        super().__init__(daemon=True)
+        self.sink = sink
+        self.metrics = metrics
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.log = log
+
+        self.rows_written = 0
+        self.failures_written = 0
+        self._queue = queue.Queue()
+        self._unsaved = 0
+        self._last_flush = time.time()
+
+    def submit(self, record):
+        """Queue a LeadRecord to be written."""
+        self._queue.put(record)
+
+    def submit_failure(self, failed):
+        """Queue a FailedLead for the failures sheet."""
+        self._queue.put(failed)
+
+    def close(self):
+        """Write everything still queued, close the sink and stop the thread."""
+        self._queue.put(self._STOP)
+        self.join()
+
+    def run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.1, self.flush_interval))
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                self._close_sink()
+                return
+
+            if isinstance(item, FailedLead):
+                try:
+                    self.sink.write_failure(item)
+                    self.failures_written += 1
+                    self._unsaved += 1
+                except Exception as e:
+                    self.log(f"Failed to write the failure of {item.address}: {e}")
+            elif item is not None:
+                try:
+                    with self._stage("write"):
+                        self.sink.write(item)
+                    self.rows_written += 1
+                    self._unsaved += 1
+                except Exception as e:
+                    self.log(f"Failed to write {item.address}: {e}")
+
+            if self._unsaved and (self._unsaved >= self.flush_every
+                                  or time.time() - self._last_flush >= self.flush_interval):
+                self._flush()
+
+    def _flush(self):
+        try:
+            with self._stage("save"):
+                self.sink.flush()
+        except Exception as e:
+            self.log(f"Failed to save output: {e}")
+            return
+        self._unsaved = 0
+        self._last_flush = time.time()
+
+    def _close_sink(self):
+        try:
+            with self._stage("save"):
+                self.sink.close()
+        except Exception as e:
+            self.log(f"Failed to save output: {e}")
+
+    def _stage(self, name):
+        """Time a sink call as a RunMetrics stage, if the writer has metrics."""
+        return self.metrics.stage(name) if self.metrics is not None else nullcontext()
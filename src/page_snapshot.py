@@ -0,0 +1,106 @@
+"""
+Reads everything general_infos needs from the property details page in one execute_script call.
+
+Values are read like Selenium's ``.text`` read them before (see VISIBLE_TEXT_JS);
+only the house features table keeps innerText's tab-separated cells, which
+its parser expects.
+"""
+
+from features import parse_house_features
+
+
+# innerText separates table cells with tabs and keeps runs of spaces, where
+# WebDriver's element text uses single spaces and trims every line
+VISIBLE_TEXT_JS = """
+const visibleText = (el) => el.innerText.split("\\n")
+    .map(line => line.replace(/[\\t \\u00a0]+/g, " ").trim())
+    .filter(line => line)
+    .join("\\n");
+"""
+
+
+DETAILS_TAB_X = '/html/body/rpr-app/rpr-layout/main/rpr-property-details/div[2]/div[5]/rpr-property-details-info-tab'
+
+# Preferred xpath first, then the alternatives
+ESTIMATE_XPATHS = [
+    f'{DETAILS_TAB_X}/div[1]/div[2]/rpr-property-details-summary-panel/div/div/div[4]/rpr-property-estimate-details/section/section[1]/section[1]/div/div[1]/span[1]',
+    f'{DETAILS_TAB_X}/div[1]/div[2]/rpr-property-details-summary-panel/div/div/div[2]/section/div[2]',
+    f'{DETAILS_TAB_X}/div[1]/div[2]/rpr-property-details-summary-panel/div/div/div[4]/rpr-property-estimate-details/section/section[1]/section[1]/div/div[1]',
+]
+ACTIVITY_X = f'{DETAILS_TAB_X}/div[2]/div[2]/div/rpr-sales-and-financing/rpr-chart-card/rpr-collapsible-panel/section/div/div/rpr-details-table/div/div[2]/table'
+PARCEL_X = f'{DETAILS_TAB_X}/div[2]/div[2]/div/rpr-property-details-two-column-details[2]/div/rpr-collapsible-panel/section/div/div/div/ul[1]/li[1]/div[2]/span'
+OWNER_FACTS_X = f'{DETAILS_TAB_X}/div[2]/div[2]/div/rpr-property-details-two-column-details[3]/div/rpr-collapsible-panel/section/div/div/div'
+HOUSE_FEATURE_X = f'{DETAILS_TAB_X}/div[2]/div[2]/div/rpr-property-details-facts/rpr-collapsible-panel/section/div/div/div/form/rpr-details-table/div/div[2]/table'
+
+SNAPSHOT_JS = VISIBLE_TEXT_JS + """
+const [estimateXpaths, activityX, parcelX, ownerFactsX, houseFeatureX] = arguments;
+const byXpath = (xpath, root = document) => document.evaluate(xpath, root, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const text = (xpath) => { const el = byXpath(xpath); return el ? visibleText(el) : null; };
+
+let estimate = null;
+for (const xpath of estimateXpaths) {
+    estimate = text(xpath);
+    if (estimate !== null) { break; }
+}
+
+let owner = null;
+for (const li of document.querySelectorAll("li.basic-fact.ng-star-inserted")) {
+    if (!li.innerText.includes("Owner Name")) { continue; }
+    // The div whose own text is the label, not a wrapper that merely contains it
+    const label = byXpath(".//div[contains(text(), 'Owner Name')]", li);
+    if (label && label.nextElementSibling) {
+        owner = visibleText(label.nextElementSibling);
+        break;
+    }
+}
+
+const ownerFacts = {};
+const factsRoot = byXpath(ownerFactsX);
+if (factsRoot) {
+    for (const li of factsRoot.querySelectorAll(":scope > ul > li")) {
+        const label = li.querySelector(":scope > div:nth-of-type(1)");
+        const value = li.querySelector(":scope > div:nth-of-type(2) > span");
+        if (label && value) {
+            ownerFacts[visibleText(label)] = visibleText(value);
+        }
+    }
+}
+
+const houseFeatures = byXpath(houseFeatureX);
+
+return {
+    estimate: estimate,
+    activity: text(activityX) || "",
+    parcel: text(parcelX) || "",
+    owner: owner,
+    owner_facts: ownerFacts,
+    house_features_text: houseFeatures ? houseFeatures.innerText : null,
+};
+"""
+
+
+def take_snapshot(browser):
+    """Return the raw page snapshot as a dict."""
+    return browser.execute_script(
+        SNAPSHOT_JS, ESTIMATE_XPATHS, ACTIVITY_X, PARCEL_X, OWNER_FACTS_X, HOUSE_FEATURE_X
+    )
+
+
+def general_data(browser):
+    """Snapshot the page and map it to the fields written by write_general_infos."""
+    snapshot = take_snapshot(browser)
+
+    house_features = {}
+    if snapshot["house_features_text"]:
+        # Header and "Your Changes" cells never match a feature label, so no trimming is needed
+        house_features = parse_house_features(snapshot["house_features_text"])
+
+    return {
+        "estimate": snapshot["estimate"] if snapshot["estimate"] is not None else "No closed price available.",
+        "activity": snapshot["activity"],
+        "parcel": snapshot["parcel"],
+        "owner": snapshot["owner"],
+        "owner_facts": snapshot["owner_facts"],
+        "house_features": house_features,
+    }
@@ -0,0 +1,114 @@
+"""
+Shared pacing of page loads, searches and tab clicks across all workers.
+
+Each kind of action draws from its own token bucket. Throttling signals from
+the site (interstitial dialogs, sign-in bounces, slow responses) put every
+bucket on hold for an exponentially growing, jittered delay; successful
+leads bring the delay back down.
+"""
+
+import json
+import random
+import threading
+import time
+
+
+PAGE_LOAD = "page_load"
+SEARCH = "search"
+TAB_CLICK = "tab_click"
+
+
+class RateLimits:
+    """Sustained rate (actions per second) and burst size for each kind of action."""
+
+    def __init__(self, page_load=1.0, search=0.5, tab_click=3.0, burst=3,
+                 backoff_base=2.0, backoff_max=120.0, slow_response=8.0):
+        self.rates = {PAGE_LOAD: page_load, SEARCH: search, TAB_CLICK: tab_click}
+        self.burst = burst
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.slow_response = slow_response
+
+
+def load_rate_limits(path, account):
+    """RateLimits for ``account`` from a JSON file of {account or "default": {field: value}}."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    settings = dict(config.get("default", {}))
+    settings.update(config.get(account, {}))
+    return RateLimits(**settings)
+
+
+class TokenBucket:
+    """Classic token bucket; take() blocks until a token is available."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Take one token, returning how long we waited for it."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """One per account, shared by every worker using it."""
+
+    def __init__(self, limits=None, log=print):
+        self.limits = limits or RateLimits()
+        self.log = log
+        self._buckets = {
+            kind: TokenBucket(rate, self.limits.burst) for kind, rate in self.limits.rates.items()
+        }
+        self._lock = threading.Lock()
+        self._level = 0
+        self._hold_until = 0.0
+        self.backoffs = 0
+        self.waited = 0.0
+
+    def acquire(self, kind):
+        """Block until an action of ``kind`` may go out."""
+        with self._lock:
+            hold = self._hold_until - time.monotonic()
+        if hold > 0:
+            time.sleep(hold)
+        waited = self._buckets[kind].take() + max(hold, 0)
+        with self._lock:
+            self.waited += waited
+
+    def backoff(self, reason):
+        """The site pushed back: hold every action for base * 2**level seconds, with jitter."""
+        with self._lock:
+            delay = min(self.limits.backoff_max, self.limits.backoff_base * 2 ** self._level)
+            delay = random.uniform(delay / 2, delay)
+            self._level += 1
+            self._hold_until = max(self._hold_until, time.monotonic() + delay)
+            self.backoffs += 1
+        self.log(f"Backing off {delay:.1f}s: {reason}")
+
+    def observe(self, elapsed, what):
+        """Back off when a response took longer than the slow_response threshold."""
+        if elapsed > self.limits.slow_response:
+            self.backoff(f"slow {what} ({elapsed:.1f}s)")
+
+    def success(self):
+        """A lead went through cleanly; step the backoff level down."""
+        with self._lock:
+            self._level = max(0, self._level - 1)
+
+    def summary(self):
+        return f"Rate limiter: {self.waited:.1f}s spent pacing, {self.backoffs} backoffs"
@@ -0,0 +1,319 @@
+"""
+Offline stand-in for RPR: serves sign-in, home/search and property pages
+with the element structure the pipeline's XPaths expect, so the real code
+can be run and benchmarked without an RPR account.
+
+    python replay_server.py --port 8765 --latency 0.3 --dialog-rate 0.05
+
+then point the pipeline at it:
+
+    RPR_BASE_URL=http://localhost:8765 RPR_AUTH_URL=http://127.0.0.1:8765 python cli.py leads.xlsx
+
+Sign-in and the app are told apart by host name, like auth.narrpr.com and
+www.narrpr.com. Property data is synthesised from the address, so the same
+lead always gives the same record. Failures are injected per request:
+interstitial dialogs on the home page, house features stuck on
+"Loading...", and "NO LOCATION FOUND" (always for addresses containing
+NOTFOUND). Only the DOM backend is supported; no JSON API is served.
+"""
+
+import argparse
+import html
+import random
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+from excel_helpers import DEED_TITLES, DISTRESS_TITLES, HOUSE_FEATURES_TITLES, MORTGAGE_TITLES
+from page_snapshot import ACTIVITY_X, ESTIMATE_XPATHS, HOUSE_FEATURE_X, OWNER_FACTS_X, PARCEL_X
+
+
+SESSION_COOKIE = "rpr_replay_session"
+
+SEARCH_FORM_X = '/html/body/rpr-app/rpr-layout/main/rpr-home/div[1]/div/rpr-property-search-form/form'
+SEARCH_BAR_X = f'{SEARCH_FORM_X}/div/div[1]/div[2]/input'
+NOT_FOUND_X = f'{SEARCH_FORM_X}/div/div[1]/div[2]/div/div/div[1]'
+SEARCH_BUTTON_X = f'{SEARCH_FORM_X}/div/div[3]/div/button'
+
+RECORD_TABS = [("Tax", []), ("Deed", DEED_TITLES), ("Mortgage", MORTGAGE_TITLES), ("Distressed", DISTRESS_TITLES)]
+
+VOID_TAGS = {"input", "br", "img", "meta"}
+
+
+class Node:
+    """Minimal HTML element tree, built by absolute XPath so positions match exactly."""
+
+    def __init__(self, tag, attrs=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.text = ""
+        self.inner_html = ""
+        self.children = []
+
+    def child(self, tag, index=1):
+        """The ``index``-th ``tag`` child (1-based, as in XPath), creating fillers as needed."""
+        same = [c for c in self.children if c.tag == tag]
+        while len(same) < index:
+            node = Node(tag)
+            self.children.append(node)
+            same.append(node)
+        return same[index - 1]
+
+    def at(self, xpath):
+        """Node for an absolute ``/html/...`` XPath made of ``tag`` and ``tag[n]`` steps."""
+        node = self
+        for step in xpath.strip("/").split("/")[1:]:
+            tag, index = re.fullmatch(r"([\w-]+)(?:\[(\d+)\])?", step).groups()
+            node = node.child(tag, int(index or 1))
+        return node
+
+    def render(self):
+        attrs = "".join(f' {k}="{html.escape(str(v))}"' for k, v in self.attrs.items())
+        if self.tag in VOID_TAGS:
+            return f"<{self.tag}{attrs}>"
+        inner = html.escape(self.text) + self.inner_html + "".join(c.render() for c in self.children)
+        return f"<{self.tag}{attrs}>{inner}</{self.tag}>"
+
+
+def render(root, body_extra=""):
+    root.child("body").inner_html = body_extra
+    return "<!DOCTYPE html>" + root.render()
+
+
+def fake_value(seed, title):
+    """Deterministic, plausible-looking value for a field."""
+    rnd = random.Random(f"{seed}:{title}")
+    if "Date" in title:
+        return f"{rnd.randint(1, 12):02d}/{rnd.randint(1, 28):02d}/{rnd.randint(1995, 2024)}"
+    if "Amount" in title or "Price" in title or "Balance" in title:
+        return f"${rnd.randint(50, 900) * 1000:,}"
+    if "#" in title or "ID" in title or "Number" in title:
+        return str(rnd.randint(100000, 999999))
+    if "Rate" in title:
+        return f"{rnd.uniform(2, 8):.3f}%"
+    return f"{title.rstrip('*')} {rnd.randint(1, 99)}"
+
+
+def two_column_table(rows, header=("Name", "Details")):
+    """thead/tbody table as read by excel_helpers.read_table."""
+    head = "".join(f"<th>{html.escape(h)}</th>" for h in header)
+    body = "".join(f"<tr><td>{html.escape(k)}</td><td>{html.escape(v)}</td></tr>" for k, v in rows)
+    return f"<thead><tr>{head}</tr></thead><tbody>{body}</tbody>"
+
+
+def home_page(not_found=False, dialog=False):
+    root = Node("html")
+    form = root.at(SEARCH_FORM_X)
+    form.attrs = {"action": "/search", "method": "get"}
+    root.at(SEARCH_BAR_X).attrs = {"name": "address", "type": "text", "style": "width:300px"}
+    root.at(SEARCH_BUTTON_X).attrs = {"type": "submit"}
+    root.at(SEARCH_BUTTON_X).text = "Search"
+    if not_found:
+        root.at(NOT_FOUND_X).text = "NO LOCATION FOUND"
+
+    extra = ""
+    if dialog:
+        # Full-window overlay that intercepts clicks until its close button removes it
+        dialog_root = Node("div", {
+            "id": "mat-mdc-dialog-0",
+            "style": "position:fixed;top:0;left:0;width:100%;height:100%;z-index:1000;background:#fff",
+        })
+        close = dialog_root.child("div").child("div").child("rpr-status-dialog").child("div").child("div")
+        close = close.child("div", 2).child("div").child("div").child("button")
+        close.attrs = {"type": "button", "onclick": "document.getElementById('mat-mdc-dialog-0').remove()"}
+        close.text = "Close"
+        extra = dialog_root.render()
+    return render(root, extra)
+
+
+def property_page(address, stall=False):
+    seed = address.lower()
+    rnd = random.Random(seed)
+    root = Node("html")
+
+    root.at(ESTIMATE_XPATHS[0]).text = f"${rnd.randint(150, 1500) * 1000:,}"
+    root.at(ACTIVITY_X).inner_html = two_column_table(
+        [("Listed", fake_value(seed, "Listing Date")), ("Sold", fake_value(seed, "Sale Date"))], ("Event", "Date")
+    )
+    root.at(PARCEL_X).text = fake_value(seed, "Parcel Number")
+
+    # Owner name is found by class and label rather than by position
+    owner = root.at(PARCEL_X.split("/ul[1]/")[0]).child("ul", 2).child("li")
+    owner.attrs = {"class": "basic-fact ng-star-inserted"}
+    owner.inner_html = f"<div>Owner Name</div><div>{html.escape(fake_value(seed, 'Owner'))}</div>"
+
+    facts = root.at(OWNER_FACTS_X).child("ul")
+    for title in ("Mailing Address", "Phone Number", "Owner Occupied", "Time Owned"):
+        li = Node("li")
+        li.inner_html = f"<div>{html.escape(title)}</div><div><span>{html.escape(fake_value(seed, title))}</span></div>"
+        facts.children.append(li)
+
+    features = root.at(HOUSE_FEATURE_X)
+    if stall:
+        features.inner_html = "<tbody><tr><td>Loading...</td></tr></tbody>"
+    else:
+        rows = "".join(
+            f"<tr><td><div>{html.escape(t)}</div><div>{html.escape(fake_value(seed, t))}</div></td></tr>"
+            for t in HOUSE_FEATURES_TITLES
+        )
+        features.inner_html = f"<tbody><tr><td>Name Public Facts Your Changes</td></tr>{rows}</tbody>"
+
+    tabs = Node("div")
+    for i, (title, fields) in enumerate(RECORD_TABS):
+        label = Node("div", {"id": f"mat-tab-group-0-label-{i}", "role": "tab"})
+        label.inner_html = f"<span></span><span><span>{title}</span></span>"
+        tabs.children.append(label)
+    for i, (title, fields) in enumerate(RECORD_TABS):
+        content = Node("div", {"id": f"mat-tab-group-0-content-{i}"})
+        table = content.child("div").child("rpr-details-table").child("div").child("div", 2).child("table")
+        table.inner_html = two_column_table([(f, fake_value(seed + title, f)) for f in fields])
+        button = content.child("div").child("rpr-details-table").child("button")
+        button.attrs = {"type": "button"}
+        button.text = "Show More"
+        tabs.children.append(content)
+    return render(root, tabs.render())
+
+
+def sign_in_page():
+    return (
+        "<!DOCTYPE html><html><body><form method='post' action='/auth/sign-in'>"
+        "<input id='SignInEmail' name='email' type='text'>"
+        "<input id='SignInPassword' name='password' type='password'>"
+        "<button id='SignInBtn' type='submit'>Sign in</button>"
+        "</form></body></html>"
+    )
+
+
+class ReplayConfig:
+    """Latency (seconds, plus up to ``jitter``) and per-request failure probabilities."""
+
+    def __init__(self, app_url, auth_url, latency=0.2, jitter=0.1, dialog_rate=0.0, stall_rate=0.0,
+                 not_found_rate=0.0, seed=None):
+        self.app_url = app_url
+        self.auth_url = auth_url
+        self.latency = latency
+        self.jitter = jitter
+        self.dialog_rate = dialog_rate
+        self.stall_rate = stall_rate
+        self.not_found_rate = not_found_rate
+        self.random = random.Random(seed)
+        self.sessions = set()
+        self.lock = threading.Lock()
+
+    def roll(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    config = None
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def do_GET(self):
+        self._delay()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/auth/sign-in":
+            return self._html(sign_in_page())
+        if url.path == "/auth/callback":
+            token = query.get("token", [""])[0]
+            return self._redirect(f"{self.config.app_url}/home", cookie=token)
+
+        if not self._signed_in():
+            return self._redirect(f"{self.config.auth_url}/auth/sign-in")
+
+        if url.path in ("/", "/home"):
+            return self._html(home_page(dialog=self.config.roll(self.config.dialog_rate)))
+        if url.path == "/search":
+            address = query.get("address", [""])[0].strip()
+            if not address or "NOTFOUND" in address.upper() or self.config.roll(self.config.not_found_rate):
+                return self._html(home_page(not_found=True))
+            return self._redirect(f"{self.config.app_url}/property/{quote(address)}")
+        if url.path.startswith("/property/"):
+            address = unquote(url.path[len("/property/"):])
+            return self._html(property_page(address, stall=self.config.roll(self.config.stall_rate)))
+
+        self.send_error(404)
+
+    def do_POST(self):
+        self._delay()
+        if urlparse(self.path).path != "/auth/sign-in":
+            return self.send_error(404)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        token = secrets.token_hex(16)
+        with self.config.lock:
+            self.config.sessions.add(token)
+        self._redirect(f"{self.config.app_url}/auth/callback?token={token}")
+
+    def _delay(self):
+        with self.config.lock:
+            delay = self.config.latency + self.config.random.uniform(0, self.config.jitter)
+        time.sleep(delay)
+
+    def _signed_in(self):
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE:
+                with self.config.lock:
+                    return value in self.config.sessions
+        return False
+
+    def _html(self, body):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location, cookie=None):
+        self.send_response(302)
+        self.send_header("Location", location)
+        if cookie:
+            self.send_header("Set-Cookie", f"{SESSION_COOKIE}={cookie}; Path=/")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def start_server(port=8765, **options):
+    """Start the replay server on a background thread. Returns (server, app_url, auth_url)."""
+    app_url = f"http://localhost:{port}"
+    auth_url = f"http://127.0.0.1:{port}"
+    handler = type("Handler", (ReplayHandler,), {"config": ReplayConfig(app_url, auth_url, **options)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, app_url, auth_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded-structure RPR pages locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--dialog-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--not-found-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server, app_url, auth_url = start_server(
+        args.port, latency=args.latency, jitter=args.jitter, dialog_rate=args.dialog_rate,
+        stall_rate=args.stall_rate, not_found_rate=args.not_found_rate, seed=args.seed
+    )
+    print(f"Replaying RPR on RPR_BASE_URL={app_url} RPR_AUTH_URL={auth_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Persistent per-address cache of extracted results, with a TTL per section.
+
+Leads that come back week after week are served from here without a
+browser. Each section of a record carries its own fetch time and TTL. A
+lookup returns the cached record together with the sections past their
+TTL: with none stale the lead needs no browser; otherwise only the stale
+sections have to be fetched again, and the fresh ones keep their fetch time.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+from addresses import canonical_address
+from output_writer import LeadRecord
+
+
+DAY = 24 * 3600
+
+# Section -> (LeadRecord fields, default TTL in seconds)
+SECTIONS = {
+    "estimate": (("estimate",), 3 * DAY),
+    "activity": (("activity",), 3 * DAY),
+    "records": (("records",), 14 * DAY),
+    "owner": (("owner", "owner_facts"), 30 * DAY),
+    "property": (("parcel", "house_features"), 180 * DAY),
+}
+
+
+class ResultCache:
+    """SQLite-backed cache keyed by canonical address (see addresses.canonical_address).
+
+    ``ttls`` overrides the per-section TTLs from SECTIONS. Entries whose
+    newest section is older than ``max_age`` are evicted, and beyond
+    ``max_entries`` the least recently used ones go first.
+    """
+
+    def __init__(self, path, ttls=None, max_entries=200000, max_age=365 * DAY):
+        self.ttls = {name: ttl for name, (_, ttl) in SECTIONS.items()}
+        self.ttls.update(ttls or {})
+        self.max_entries = max_entries
+        self.max_age = max_age
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.reused = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                sections TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self.evict()
+
+    def get(self, address):
+        """Return ``(record, stale)`` for ``address``.
+
+        ``record`` is the cached LeadRecord (None on a miss) and ``stale`` the
+        set of section names past their TTL; every section is stale on a miss.
+        """
+        key = canonical_address(address)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT sections FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, set(SECTIONS)
+
+            sections = json.loads(row[0])
+            stale = {name for name, ttl in self.ttls.items()
+                     if name not in sections or now - sections[name]["fetched_at"] > ttl}
+            if stale == set(SECTIONS):
+                self.stale += 1
+                return None, stale
+            if stale:
+                self.stale += 1
+            else:
+                self.hits += 1
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+
+        fields = {}
+        for name in SECTIONS:
+            if name in sections:
+                fields.update(sections[name]["value"])
+        return LeadRecord(address=address, **fields), stale
+
+    def put(self, record, reused=()):
+        """Store an extracted record. Sections in ``reused`` came from the cache and keep their fetch time."""
+        key = canonical_address(record.address)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT sections FROM results WHERE key = ?", (key,)).fetchone()
+            old = json.loads(row[0]) if row is not None else {}
+            sections = {}
+            for name, (fields, _) in SECTIONS.items():
+                if name in reused and name in old:
+                    sections[name] = old[name]
+                else:
+                    sections[name] = {"fetched_at": now, "value": {f: getattr(record, f) for f in fields}}
+            if reused:
+                self.reused += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, sections, fetched_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(sections, ensure_ascii=False), now, now)
+            )
+
+    def evict(self):
+        """Drop entries past ``max_age``, then the least recently used ones beyond ``max_entries``."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE fetched_at < ?", (time.time() - self.max_age,))
+            self._conn.execute("""
+                DELETE FROM results WHERE key IN (
+                    SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def summary(self):
+        return (f"Cache: {self.hits} hits, {self.misses} misses, {self.stale} stale "
+                f"({self.reused} refreshed with fresh sections reused)")
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,292 @@
+"""
+Pool of long-lived, logged-in Chrome sessions shared by the lead workers.
+
+A background spawner keeps a few spare sessions launched and logged in, so
+replacing a crashed or recycled browser does not put ChromeDriver startup
+on a lead's critical path.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from selenium.common.exceptions import WebDriverException
+
+from auth import SIGN_IN_HOST
+from concurrency import kill_process_tree
+
+
+class PooledBrowser:
+    """A driver owned by the pool plus the bookkeeping used for recycling."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, driver):
+        self.id = next(self._ids)
+        self.driver = driver
+        self.created_at = time.time()
+        self.leads_served = 0
+
+
+class SessionPool:
+    """Hands out authenticated drivers to workers and takes them back.
+
+    Sessions are created lazily up to ``size``. A session is recycled after
+    ``max_leads`` leads or ``max_age`` seconds, re-logged in when the site
+    bounced it back to sign-in, and replaced when the driver stopped answering.
+
+    ``spares`` sessions are kept ready outside of ``size``; a new session is
+    taken from them when one is ready (the spawner then builds the next one)
+    and launched on the spot otherwise. Once the pool has been filled, such
+    an on-the-spot launch counts as a starvation.
+    Launches are timed as the "spawn" stage of ``metrics``.
+    """
+
+    def __init__(self, create_browser, login, size=9, max_leads=50, max_age=1800, log=print,
+                 on_discard=None, spares=0, metrics=None):
+        self.create_browser = create_browser
+        self.login = login
+        self.on_discard = on_discard
+        self.size = size
+        self.max_leads = max_leads
+        self.max_age = max_age
+        self.log = log
+        self.spares = spares
+        self.metrics = metrics
+
+        self.launched = 0
+        self.spawn_seconds = 0.0
+        self.from_spares = 0
+        self.starved = 0
+
+        self._idle = queue.Queue()
+        self._spare = queue.Queue()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._filled = 0
+        self._closed = False
+        self._all = set()
+
+        self._spawner = None
+        if spares:
+            self._spawner = threading.Thread(target=self._keep_spares, daemon=True)
+            self._spawner.start()
+
+    @contextmanager
+    def session(self, timeout=None):
+        """Check out a driver for the duration of the ``with`` block."""
+        pooled = self.checkout(timeout)
+        try:
+            yield pooled.driver
+        finally:
+            self.checkin(pooled)
+
+    def checkout(self, timeout=None):
+        """Return a healthy, logged-in session, creating one if allowed."""
+        while True:
+            pooled = self._take_idle_or_reserve(timeout)
+            if pooled is None:
+                pooled = self._new_session()
+            if self._ensure_ready(pooled):
+                return pooled
+
+    def checkin(self, pooled):
+        """Give a session back to the pool, recycling it if it is worn out."""
+        pooled.leads_served += 1
+        if not self.owns(pooled):
+            # Its slot was freed by kill(); only the client side is left to clean up
+            self._quit(pooled)
+            return
+        if self._closed:
+            self._discard(pooled)
+            return
+        if pooled.leads_served >= self.max_leads or time.time() - pooled.created_at >= self.max_age:
+            self.log("Recycling browser session")
+            self._discard(pooled)
+            return
+        if self._created > self.size:
+            self._discard(pooled)
+            return
+        self._idle.put(pooled)
+
+    def kill(self, pooled):
+        """Kill a checked-out session that stopped responding and free its slot at once.
+
+        The worker's pending command fails once the browser is gone; a
+        replacement can be launched before that worker returns.
+        """
+        with self._lock:
+            if pooled not in self._all:
+                return
+            self._all.discard(pooled)
+            self._created -= 1
+        kill = getattr(pooled.driver, "kill", None)
+        try:
+            if kill is not None:
+                kill()
+            else:
+                kill_process_tree(pooled.driver.service.process.pid)
+        except Exception as e:
+            self.log(f"Failed to kill browser session: {e}")
+
+    def owns(self, pooled):
+        """False once ``pooled`` was discarded or killed."""
+        with self._lock:
+            return pooled in self._all
+
+    def resize(self, size):
+        """Change how many sessions may exist, quitting idle ones above the new size."""
+        with self._lock:
+            self.size = size
+            excess = self._created - size
+        while excess > 0:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                return  # Busy sessions are dropped as they come back
+            self._discard(pooled)
+            excess -= 1
+
+    def close(self):
+        """Quit every driver owned by the pool, spares included."""
+        self._closed = True
+        self._wake.set()
+        if self._spawner is not None:
+            self._spawner.join()
+        with self._lock:
+            sessions = list(self._all)
+        for pooled in sessions:
+            self._discard(pooled)
+        while True:
+            try:
+                self._quit(self._spare.get_nowait())
+            except queue.Empty:
+                break
+
+    def summary(self):
+        average = self.spawn_seconds / self.launched if self.launched else 0.0
+        return (f"Browser pool: {self.launched} launched ({average:.1f}s each on average), "
+                f"{self.from_spares} taken from spares, {self.starved} starved")
+
+    def _take_idle_or_reserve(self, timeout):
+        """Return an idle session, or None after reserving a slot for a new one."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    return None
+
+            # A discarded session frees a slot without touching the queue, so poll
+            if deadline is not None and time.time() >= deadline:
+                raise queue.Empty
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _new_session(self):
+        """Fill a reserved slot with a spare session, or launch one if none is ready."""
+        try:
+            pooled = self._spare.get_nowait()
+        except queue.Empty:
+            pooled = None
+
+        if pooled is not None:
+            self._wake.set()
+            self.from_spares += 1
+            # Age counts from when the session starts serving leads
+            pooled.created_at = time.time()
+        else:
+            if self.spares and self._filled >= self.size:
+                self.starved += 1
+                if self.metrics is not None:
+                    self.metrics.count("pool_starved")
+                self.log("No spare browser ready, launching one for this lead")
+            try:
+                pooled = self._launch()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        with self._lock:
+            self._all.add(pooled)
+            self._filled += 1
+        return pooled
+
+    def _launch(self):
+        """Start and log in a new driver, timing it."""
+        start = time.time()
+        with self.metrics.stage("spawn") if self.metrics is not None else nullcontext():
+            pooled = PooledBrowser(self.create_browser())
+            try:
+                self.login(pooled.driver)
+            except Exception:
+                self._quit(pooled)
+                raise
+        with self._lock:
+            self.launched += 1
+            self.spawn_seconds += time.time() - start
+        return pooled
+
+    def _keep_spares(self):
+        """Spawner thread: top the spares back up whenever one is taken."""
+        while not self._closed:
+            if self._spare.qsize() >= self.spares:
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            try:
+                pooled = self._launch()
+            except Exception as e:
+                self.log(f"Failed to launch a spare browser: {e}")
+                self._wake.wait(5.0)
+                continue
+            if self._closed:
+                self._quit(pooled)
+                return
+            self._spare.put(pooled)
+
+    def _ensure_ready(self, pooled):
+        """Health-check a session; re-login expired ones and drop dead ones."""
+        try:
+            current_url = pooled.driver.current_url
+        except WebDriverException:
+            self.log("Browser session crashed, replacing it")
+            self._discard(pooled)
+            return False
+
+        if SIGN_IN_HOST in current_url:
+            self.log("Browser session expired, refreshing login")
+            try:
+                self.login(pooled.driver)
+            except WebDriverException:
+                self._discard(pooled)
+                return False
+        return True
+
+    def _discard(self, pooled):
+        """Quit a driver and free its slot."""
+        with self._lock:
+            if pooled not in self._all:
+                return
+            self._all.discard(pooled)
+            self._created -= 1
+        self._quit(pooled)
+
+    def _quit(self, pooled):
+        if self.on_discard is not None:
+            self.on_discard(pooled.driver)
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
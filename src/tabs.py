@@ -0,0 +1,163 @@
+"""
+Several leads per Chrome process, one tab each.
+
+Every WebDriver command of a browser goes through its ``execute`` method.
+TabbedBrowser replaces it with one that holds a per-browser lock and first
+switches to the window handle of the tab the calling thread is using, so
+workers drive their tab as if it were a browser of its own. TabDriver is
+that per-tab view: it stands in for the driver everywhere (session pool,
+waits, extraction) and quit() closes only its tab.
+"""
+
+import threading
+
+from selenium.webdriver.remote.command import Command
+
+from concurrency import kill_process_tree
+
+
+class TabbedBrowser:
+    """One Chrome process shared by up to ``capacity`` tabs."""
+
+    def __init__(self, browser_id, driver, capacity):
+        self.id = browser_id
+        self.driver = driver
+        self.capacity = capacity
+        self.open_tabs = 0
+        self.reserved = 0
+        self.alive = True
+
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._first_handle = driver.current_window_handle
+        self._current = self._first_handle
+        self._execute = driver.execute
+        driver.execute = self._tab_execute
+
+    def activate(self, handle):
+        """Send the calling thread's commands to ``handle`` from now on."""
+        self._local.handle = handle
+
+    def open_tab(self):
+        with self._lock:
+            if self._first_handle is not None:
+                handle, self._first_handle = self._first_handle, None
+            else:
+                try:
+                    handle = self._execute(Command.NEW_WINDOW, {"type": "tab"})["value"]["handle"]
+                except Exception:
+                    self.alive = False
+                    raise
+            self.open_tabs += 1
+        return TabDriver(self, handle)
+
+    def close_tab(self, handle):
+        """Close one tab; the browser quits with its last tab. Returns True once it is gone."""
+        with self._lock:
+            self.open_tabs -= 1
+            if self.open_tabs <= 0 or not self.alive:
+                last = self.open_tabs <= 0
+            else:
+                last = False
+                try:
+                    self._switch(handle)
+                    self._execute(Command.CLOSE)
+                    self._current = None
+                except Exception:
+                    # The process is gone or wedged; hand out no more tabs from it
+                    self.alive = False
+            if last:
+                self.alive = False
+                self.quit()
+        return last
+
+    def kill(self):
+        """Kill Chrome and its chromedriver without waiting on a command in progress."""
+        self.alive = False
+        kill_process_tree(self.driver.service.process.pid)
+
+    def quit(self):
+        """Quit Chrome and its chromedriver."""
+        self.activate(None)
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+    def _switch(self, handle):
+        if handle != self._current:
+            self._execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+            self._current = handle
+
+    def _tab_execute(self, driver_command, params=None):
+        handle = getattr(self._local, "handle", None)
+        with self._lock:
+            if handle is not None and driver_command != Command.SWITCH_TO_WINDOW:
+                self._switch(handle)
+            return self._execute(driver_command, params)
+
+
+class TabDriver:
+    """A single tab that behaves like a WebDriver for the thread using it."""
+
+    def __init__(self, browser, handle):
+        self._browser = browser
+        self._handle = handle
+        self.browser_name = f"chrome-{browser.id}"
+
+    def __getattr__(self, name):
+        # Any use of the driver from this thread targets this tab, including
+        # later calls on elements it returned
+        self._browser.activate(self._handle)
+        return getattr(self._browser.driver, name)
+
+    def kill(self):
+        """Kill the whole Chrome behind this tab; its other tabs fail and are replaced."""
+        self._browser.kill()
+
+    def quit(self):
+        """Close this tab (and the browser once no tab is left)."""
+        self._browser.activate(None)
+        self._browser.close_tab(self._handle)
+
+
+class TabAllocator:
+    """Opens tabs in existing browsers while they have room, launching new ones as needed."""
+
+    def __init__(self, launch_browser, tabs_per_browser):
+        self.launch_browser = launch_browser
+        self.tabs_per_browser = tabs_per_browser
+        self._browsers = []
+        self._lock = threading.Lock()
+        self._launched = 0
+
+    def open_tab(self):
+        with self._lock:
+            self._browsers = [browser for browser in self._browsers if browser.alive]
+            browser = next((b for b in self._browsers if b.open_tabs + b.reserved < b.capacity), None)
+            if browser is not None:
+                browser.reserved += 1
+
+        if browser is None:
+            # Launch outside the lock so other tabs can still be opened meanwhile
+            driver = self.launch_browser()
+            with self._lock:
+                self._launched += 1
+                browser = TabbedBrowser(self._launched, driver, self.tabs_per_browser)
+                browser.reserved += 1
+                self._browsers.append(browser)
+
+        try:
+            return browser.open_tab()
+        finally:
+            with self._lock:
+                browser.reserved -= 1
+
+    def close(self):
+        """Quit browsers whose tabs were not all closed."""
+        with self._lock:
+            browsers, self._browsers = self._browsers, []
+        for browser in browsers:
+            if browser.alive:
+                browser.alive = False
+                browser.quit()
@@ -0,0 +1,139 @@
+"""
+Condition-based waits that replace fixed sleeps, with per-call-site timing.
+"""
+
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+POLL_INTERVAL = 0.1
+
+
+class WaitProfile:
+    """Deadlines (seconds) for each kind of wait, plus whether to humanize with scroll()."""
+
+    def __init__(self, name, scroll=True, page_load=25, login_redirect=30, search_bar=30,
+                 search_result=10, house_features=40, records_tab=5):
+        self.name = name
+        self.scroll = scroll
+        self.page_load = page_load
+        self.login_redirect = login_redirect
+        self.search_bar = search_bar
+        self.search_result = search_result
+        self.house_features = house_features
+        self.records_tab = records_tab
+
+
+PROFILES = {
+    "default": WaitProfile("default"),
+    "fast": WaitProfile("fast", scroll=False, records_tab=3),
+}
+
+
+class WaitStats:
+    """Thread-safe totals of time actually spent waiting, keyed by call site."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites = {}
+
+    def record(self, site, elapsed, timed_out=False):
+        with self._lock:
+            count, total, longest, timeouts = self._sites.get(site, (0, 0.0, 0.0, 0))
+            self._sites[site] = (count + 1, total + elapsed, max(longest, elapsed), timeouts + int(timed_out))
+
+    def reset(self):
+        with self._lock:
+            self._sites = {}
+
+    def summary(self):
+        """Return one line per call site, slowest total first."""
+        with self._lock:
+            sites = sorted(self._sites.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            f"{site}: {count} waits, {total:.1f}s total, {total / count:.2f}s avg, "
+            f"{longest:.2f}s max, {timeouts} timeouts"
+            for site, (count, total, longest, timeouts) in sites
+        ]
+
+
+wait_stats = WaitStats()
+
+
+def wait_until(driver, condition, timeout, site):
+    """Poll ``condition(driver)`` until it is truthy and return its value.
+
+    Raises TimeoutException after ``timeout`` seconds. The elapsed time is
+    recorded under ``site`` either way.
+    """
+    start = time.time()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        wait_stats.record(site, time.time() - start, timed_out=True)
+        raise
+    wait_stats.record(site, time.time() - start)
+    return result
+
+
+def document_complete(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def angular_stable(driver):
+    """True once every Angular app on the page reports no pending work (or there is no Angular)."""
+    return driver.execute_script("""
+        if (!window.getAllAngularTestabilities) { return true; }
+        return window.getAllAngularTestabilities().every(t => t.isStable());
+    """)
+
+
+def page_ready(driver):
+    return document_complete(driver) and angular_stable(driver)
+
+
+def text_ready(xpath):
+    """Element present and its text no longer contains "Loading..."; returns the text."""
+    def condition(driver):
+        return driver.execute_script("""
+            const el = document.evaluate(arguments[0], document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (!el) { return false; }
+            const text = el.innerText;
+            return text.includes("Loading...") ? false : text;
+        """, xpath)
+    return condition
+
+
+def element_present(xpath):
+    """Element present; returns True."""
+    def condition(driver):
+        return driver.execute_script("""
+            return document.evaluate(arguments[0], document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+        """, xpath)
+    return condition
+
+
+def text_contains(xpath, text):
+    """Element present and its text contains ``text``; returns True."""
+    def condition(driver):
+        return driver.execute_script("""
+            const el = document.evaluate(arguments[0], document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            return el !== null && el.innerText.includes(arguments[1]);
+        """, xpath, text)
+    return condition
+
+
+def any_of(*conditions):
+    """First of ``conditions`` that holds, as its index + 1 (so it stays truthy)."""
+    def condition(driver):
+        for i, check in enumerate(conditions):
+            if check(driver):
+                return i + 1
+        return False
+    return condition
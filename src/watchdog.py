@@ -0,0 +1,85 @@
+"""
+Per-lead deadline enforced by a supervisor thread.
+
+Every wait in a lead is bounded, but a wedged page can still hang a
+WebDriver command for minutes. The watchdog keeps the leads in progress
+with their deadlines; once one runs past it, the stage the lead is stuck in
+is recorded and ``on_expire(watch)`` is called, which kills the browser so
+the worker's pending command fails and the lead ends as a timeout.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Watch:
+    """One lead under supervision; ``expired`` and ``stage`` are set when its deadline passes."""
+
+    def __init__(self, address, pooled, deadline):
+        self.address = address
+        self.pooled = pooled
+        self.started = time.time()
+        self.deadline = self.started + deadline
+        self.thread = threading.get_ident()
+        self.expired = False
+        self.stage = None
+
+
+class LeadWatchdog:
+    """Expires leads still running ``deadline`` seconds after they got a browser.
+
+    ``stage_of(thread_id)`` tells which stage a worker thread is in (see
+    RunMetrics.current_stage). Deadlines are checked every ``interval`` seconds.
+    """
+
+    def __init__(self, deadline, on_expire, stage_of=None, log=print, interval=1.0):
+        self.deadline = deadline
+        self.on_expire = on_expire
+        self.stage_of = stage_of
+        self.log = log
+        self.interval = interval
+        self.expired = 0
+
+        self._watches = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._supervise, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @contextmanager
+    def watch(self, address, pooled):
+        """Supervise the calling thread's lead on ``pooled`` for the duration of the ``with`` block."""
+        watch = Watch(address, pooled, self.deadline)
+        with self._lock:
+            self._watches.add(watch)
+        try:
+            yield watch
+        finally:
+            with self._lock:
+                self._watches.discard(watch)
+
+    def _supervise(self):
+        while not self._stop.wait(self.interval):
+            now = time.time()
+            with self._lock:
+                overdue = [watch for watch in self._watches if not watch.expired and now >= watch.deadline]
+                for watch in overdue:
+                    if self.stage_of is not None:
+                        watch.stage = self.stage_of(watch.thread)
+                    watch.expired = True
+            for watch in overdue:
+                self.expired += 1
+                try:
+                    self.on_expire(watch)
+                except Exception as e:
+                    self.log(f"Failed to stop {watch.address} after its deadline: {e}")
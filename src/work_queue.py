@@ -0,0 +1,311 @@
+"""
+Durable SQLite work queue for sharding one lead file across worker processes.
+
+A coordinator loads the leads once; any number of worker processes then
+claim leads under a lease, extract them and post the results back. Leases
+that run out (crashed or killed worker) are reclaimed by the next claim.
+Input rows that spell the same address differently are queued once and the
+merge step writes the result for each of them, in input order:
+
+    python work_queue.py init leads.queue.sqlite leads.xlsx
+    python work_queue.py work leads.queue.sqlite --processes 4 --workers 3
+    python work_queue.py status leads.queue.sqlite
+    python work_queue.py merge leads.queue.sqlite output.xlsx --format xlsx
+
+Workers on other machines can share the queue over a network filesystem
+with ``--shared``, which swaps WAL (same host only) for the rollback journal.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+
+from addresses import LeadGroups
+from engine import BACKENDS, BACKEND_DOM, ExtractionEngine
+from failures import TRANSIENT
+from formatting import clean_address
+from lead_reader import parse_column, read_leads
+from journal import (
+    DONE,
+    FAILED,
+    NOT_FOUND,
+    PENDING,
+    add_failure_columns,
+    add_variants_table,
+    failed_lead,
+    load_lead_groups,
+    store_variants,
+    write_results,
+)
+from output_writer import OUTPUT_FORMATS, LeadRecord, OutputWriter, open_sink
+from waits import PROFILES
+
+
+CLAIMED = "claimed"
+
+
+class WorkQueue:
+    """Lead queue with claim/lease semantics, safe across threads and processes.
+
+    Exposes the same mark_done / mark_not_found / mark_failed calls as
+    Journal, so the engine records outcomes the same way in both modes.
+    A lead that failed transiently (failures.TRANSIENT) goes back to pending
+    until it has used ``max_attempts``; any other failure is final at once.
+    """
+
+    def __init__(self, path, lease=600, max_attempts=3, shared=False):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute(f"PRAGMA journal_mode={'DELETE' if shared else 'WAL'}")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS leads (
+                address TEXT PRIMARY KEY,
+                position INTEGER,
+                status TEXT NOT NULL,
+                worker TEXT,
+                lease_until REAL,
+                record TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS leads_status ON leads (status, position)")
+        add_failure_columns(self._conn)
+        # Other input rows with the same address as a queued lead, written out at merge
+        add_variants_table(self._conn)
+
+    def add_leads(self, addresses):
+        """Queue leads as pending after those already queued; known leads keep their status."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            start = self._conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM leads").fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO leads (address, position, status, updated_at) VALUES (?, ?, ?, ?)",
+                [(address, start + offset, PENDING, time.time()) for offset, address in enumerate(addresses)]
+            )
+            self._conn.execute("COMMIT")
+
+    def claim(self, worker):
+        """Lease the next pending (or expired) lead to ``worker``; None once nothing is claimable."""
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two processes never claim the same row
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE leads SET status = ?, error = 'Lease expired', updated_at = ? "
+                    "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                    (FAILED, now, CLAIMED, now, self.max_attempts)
+                )
+                row = self._conn.execute(
+                    "SELECT address FROM leads WHERE status = ? OR (status = ? AND lease_until < ?) "
+                    "ORDER BY position LIMIT 1",
+                    (PENDING, CLAIMED, now)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE leads SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, "
+                        "updated_at = ? WHERE address = ?",
+                        (CLAIMED, worker, now + self.lease, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row[0] if row else None
+
+    def mark_done(self, record):
+        self._finish(record.address, DONE, record=json.dumps(asdict(record), ensure_ascii=False))
+
+    def mark_not_found(self, address, stage=None, error=None):
+        self._finish(address, NOT_FOUND, stage=stage, error=error)
+
+    def mark_failed(self, address, error, failure=None, stage=None):
+        """Put the lead back in the queue, or fail it for good once out of attempts or not transient.
+
+        An unclassified failure (``failure`` None) is retried like a transient one.
+        """
+        max_attempts = self.max_attempts if failure is None or failure in TRANSIENT else 0
+        with self._lock:
+            self._conn.execute(
+                "UPDATE leads SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = ?, failure = ?, stage = ?, worker = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE address = ? AND status NOT IN (?, ?)",
+                (max_attempts, FAILED, PENDING, str(error), failure, stage, time.time(), address, DONE,
+                 NOT_FOUND)
+            )
+
+    def add_variants(self, pairs):
+        """Remember (address, variant) pairs: other input rows a queued lead stands for."""
+        with self._lock:
+            store_variants(self._conn, pairs)
+
+    def lead_groups(self):
+        """LeadGroups of the queued leads, so merge can write one row per input row."""
+        with self._lock:
+            return load_lead_groups(self._conn)
+
+    def remaining(self):
+        """Leads that are pending or still leased to a worker."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM leads WHERE status IN (?, ?)", (PENDING, CLAIMED)
+            ).fetchone()[0]
+
+    def completed_records(self):
+        """Yield the LeadRecord of every lead extracted so far, in input order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM leads WHERE status = ? ORDER BY position", (DONE,)
+            ).fetchall()
+        for (record,) in rows:
+            yield LeadRecord(**json.loads(record))
+
+    def failed_leads(self):
+        """Yield a FailedLead for every lead that failed for good or was not found, in input order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT address, status, failure, stage, attempts, error FROM leads WHERE status IN (?, ?) "
+                "ORDER BY position",
+                (FAILED, NOT_FOUND)
+            ).fetchall()
+        for row in rows:
+            yield failed_lead(*row)
+
+    def counts(self):
+        """Number of leads per status."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM leads GROUP BY status").fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _finish(self, address, status, record=None, stage=None, error=None):
+        # A late result from a worker whose lease expired is still a valid result
+        with self._lock:
+            self._conn.execute(
+                "UPDATE leads SET status = ?, record = ?, error = ?, stage = ?, worker = NULL, "
+                "lease_until = NULL, updated_at = ? WHERE address = ?",
+                (status, record, error, stage, time.time(), address)
+            )
+
+
+def worker_id():
+    """Identifies this process in the queue, e.g. ``host:1234``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def load_leads(queue_path, file_path, shared=False, sheet=None, column=0, batch_size=1000):
+    """Coordinator step: queue every distinct lead of ``file_path``. Returns its LeadGroups.
+
+    Leads are committed in batches while the file is read, so workers that
+    are already running can start on them.
+    """
+    lead_groups = LeadGroups()
+    work_queue = WorkQueue(queue_path, shared=shared)
+    try:
+        batch = []
+        for lead in read_leads(file_path, sheet, column):
+            lead = clean_address(lead)
+            if lead and lead_groups.add(lead):
+                batch.append(lead)
+                if len(batch) >= batch_size:
+                    work_queue.add_leads(batch)
+                    batch = []
+        work_queue.add_leads(batch)
+        work_queue.add_variants(lead_groups.variant_pairs())
+    finally:
+        work_queue.close()
+    return lead_groups
+
+
+def run_worker(queue_path, workers, profile, backend, shared=False):
+    """Worker process: claim and extract leads until the queue is drained."""
+    def print_log(event):
+        if event["type"] == "log":
+            print(f"[{worker_id()}] {event['message']}", flush=True)
+
+    engine = ExtractionEngine(workers=workers, profile=profile, backend=backend)
+    engine.subscribe(print_log)
+    work_queue = WorkQueue(queue_path, shared=shared)
+    try:
+        engine.work(work_queue, worker_id())
+    finally:
+        work_queue.close()
+
+
+def merge(queue_path, output_path, output_format="xlsx", shared=False):
+    """Write every completed lead to ``output_path``, once per input row. Returns the row count."""
+    work_queue = WorkQueue(queue_path, shared=shared)
+    writer = OutputWriter(open_sink(output_format, output_path))
+    writer.start()
+    try:
+        write_results(work_queue, writer)
+    finally:
+        writer.close()
+        work_queue.close()
+    return writer.rows_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shard a lead file across worker processes.")
+    parser.add_argument("--shared", action="store_true", help="Queue lives on a network filesystem")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init = commands.add_parser("init", help="Queue the leads of an input file")
+    init.add_argument("queue")
+    init.add_argument("input")
+    init.add_argument("--sheet", help="Sheet name or 0-based index (Excel input, default: the first sheet)")
+    init.add_argument("--column", type=parse_column, default=0, help="0-based column index or header name")
+
+    work = commands.add_parser("work", help="Claim and extract leads until none are left")
+    work.add_argument("queue")
+    work.add_argument("--processes", type=int, default=1)
+    work.add_argument("--workers", type=int, default=3, help="Browser sessions per process")
+    work.add_argument("--profile", default="default", choices=list(PROFILES))
+    work.add_argument("--backend", default=BACKEND_DOM, choices=list(BACKENDS))
+
+    status = commands.add_parser("status", help="Show lead counts per status")
+    status.add_argument("queue")
+
+    merge_cmd = commands.add_parser("merge", help="Build the output file from finished leads")
+    merge_cmd.add_argument("queue")
+    merge_cmd.add_argument("output")
+    merge_cmd.add_argument("--format", default="xlsx", choices=list(OUTPUT_FORMATS))
+
+    args = parser.parse_args()
+
+    if args.command == "init":
+        lead_groups = load_leads(args.queue, args.input, args.shared, args.sheet, args.column)
+        print(f"Queued {len(lead_groups.unique)} leads in {args.queue}. {lead_groups.summary()}")
+    elif args.command == "work":
+        worker_args = (args.queue, args.workers, args.profile, args.backend, args.shared)
+        processes = [multiprocessing.Process(target=run_worker, args=worker_args) for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    elif args.command == "status":
+        work_queue = WorkQueue(args.queue, shared=args.shared)
+        for name, count in sorted(work_queue.counts().items()):
+            print(f"{name}: {count}")
+        work_queue.close()
+    elif args.command == "merge":
+        rows = merge(args.queue, args.output, args.format, args.shared)
+        print(f"Wrote {rows} leads to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules live flat in src/ and import each other by name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+class FakeClock:
+    """Stands in for a module's ``time``: time(), monotonic() and sleep() on a manual clock."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.slept = 0.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,46 @@
+from addresses import LeadGroups, canonical_address
+from output_writer import LeadRecord
+
+
+def test_canonical_address_folds_spellings():
+    assert canonical_address("12 North Main Street, Springfield, IL 62704-1234") == \
+        canonical_address("12 N MAIN ST Springfield IL 62704")
+    assert canonical_address("5 Elm Avenue Apt 4") == canonical_address("5 elm ave #4")
+    assert canonical_address("5 Elm Ave Suite #4") == "5 elm ave unit 4"
+
+
+def test_canonical_address_keeps_units_apart():
+    assert canonical_address("5 Elm Ave Apt 4") != canonical_address("5 Elm Ave Apt 5")
+    assert canonical_address("5 Elm Ave Apt 4") != canonical_address("5 Elm Ave")
+
+
+def test_lead_groups_search_first_spelling_once():
+    groups = LeadGroups(["12 Main Street", "9 Oak Rd", "12 MAIN ST", "9 oak road", "12 Main St."])
+
+    assert groups.unique == ["12 Main Street", "9 Oak Rd"]
+    assert groups.rows == 5
+    assert groups.saved == 3
+    assert groups.first("12 main st") == "12 Main Street"
+    assert list(groups.variant_pairs()) == [
+        ("12 Main Street", "12 MAIN ST"), ("12 Main Street", "12 Main St."), ("9 Oak Rd", "9 oak road"),
+    ]
+
+
+def test_lead_groups_expand_one_row_per_input_spelling():
+    groups = LeadGroups(["12 Main Street", "12 MAIN ST"])
+    record = LeadRecord(address="12 Main Street", estimate="$100")
+
+    rows = groups.expand(record)
+
+    assert [row.address for row in rows] == ["12 Main Street", "12 MAIN ST"]
+    assert rows[0] is record
+    assert all(row.estimate == "$100" for row in rows)
+    assert [row.address for row in groups.expand(LeadRecord(address="7 Unknown Rd"))] == ["7 Unknown Rd"]
+
+
+def test_lead_groups_add_variants_restores_groups():
+    groups = LeadGroups()
+    groups.add_variants("12 Main Street", ["12 Main Street", "12 MAIN ST"])
+
+    assert groups.variants("12 Main Street") == ["12 Main Street", "12 MAIN ST"]
+    assert groups.first("12 main st") == "12 Main Street"
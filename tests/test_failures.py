@@ -0,0 +1,77 @@
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException, WebDriverException
+
+import failures
+from failures import DRIVER_CRASH, ERROR, NOT_FOUND, TIMEOUT, LeadFailure, RetryQueue, classify, describe
+
+
+@pytest.fixture
+def queue(monkeypatch, clock):
+    monkeypatch.setattr(failures, "time", clock)
+    monkeypatch.setattr(failures.random, "uniform", lambda low, high: 1.0)
+    return RetryQueue(max_attempts=3, backoff_base=10, backoff_max=25)
+
+
+def test_classify():
+    assert classify(LeadFailure(NOT_FOUND, "No location found")) == NOT_FOUND
+    assert classify(TimeoutException("slow")) == TIMEOUT
+    assert classify(InvalidSessionIdException("gone")) == DRIVER_CRASH
+    assert classify(WebDriverException("chrome not reachable")) == DRIVER_CRASH
+    assert classify(ValueError("bad")) == ERROR
+
+
+def test_describe_keeps_the_first_line():
+    assert describe(WebDriverException("invalid session id\nStacktrace: ...")) == "invalid session id"
+    assert describe(TimeoutException()) == "TimeoutException"
+
+
+def test_backoff_doubles_and_is_capped(queue, clock):
+    assert queue.failed("a", TIMEOUT)
+    assert queue.next_due_in() == 10
+
+    clock.advance(10)
+    assert queue.pop_due() == ["a"]
+    assert queue.failed("a", TIMEOUT)
+    assert queue.next_due_in() == 20
+    assert queue.attempts("a") == 2
+
+
+def test_backoff_max_caps_the_delay(monkeypatch, clock):
+    monkeypatch.setattr(failures, "time", clock)
+    monkeypatch.setattr(failures.random, "uniform", lambda low, high: 1.0)
+    queue = RetryQueue(max_attempts=10, backoff_base=10, backoff_max=25)
+    for _ in range(3):
+        queue.failed("a", TIMEOUT)
+        clock.advance(1000)
+        queue.pop_due()
+
+    queue.failed("a", TIMEOUT)
+    assert queue.next_due_in() == 25
+
+
+def test_gives_up_after_max_attempts(queue, clock):
+    assert queue.failed("a", DRIVER_CRASH)
+    assert queue.failed("a", DRIVER_CRASH)
+    assert not queue.failed("a", DRIVER_CRASH)
+    assert queue.attempts("a") == 3
+    assert queue.retried == 2
+
+
+def test_not_found_is_final(queue):
+    assert not queue.failed("a", NOT_FOUND)
+    assert len(queue) == 0
+    assert queue.next_due_in() is None
+
+
+def test_pop_due_returns_only_due_leads_earliest_first(queue, clock):
+    queue.failed("first", TIMEOUT)
+    clock.advance(5)
+    queue.failed("second", TIMEOUT)
+    queue.failed("second-later", TIMEOUT)
+
+    assert queue.pop_due() == []
+    clock.advance(5)
+    assert queue.pop_due() == ["first"]
+    clock.advance(5)
+    assert queue.pop_due() == ["second", "second-later"]
+    assert len(queue) == 0
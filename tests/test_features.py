@@ -0,0 +1,49 @@
+from features import HOUSE_FEATURE_SCHEMA, parse_house_features, to_float, to_int
+
+
+TABLE = (
+    "Feature\tValue\tYour Changes\n"
+    "Property Type\tSingle Family\n"
+    "Bedrooms\t3\n"
+    "Bathrooms\t2.5\n"
+    "Full Baths\t2\n"
+    "Living Area\t1,850 sq ft\n"
+    "Garage\t\n"
+    "Year Built\t1978"
+)
+
+
+def test_parse_maps_aliases_to_titles_and_types():
+    features = parse_house_features(TABLE)
+
+    assert features["Property Type"] == "Single Family"
+    assert features["Bedrooms*"] == 3
+    assert features["Total Baths"] == 2.5
+    assert features["Full Baths*"] == 2
+    assert features["Living Area (sq ft)*"] == 1850
+    assert features["Year Built*"] == 1978
+    assert "Building Area (sq ft)" not in features
+
+
+def test_parse_label_without_value_is_empty():
+    assert parse_house_features("Garage\nYear Built\n2001") == {"Garage (spaces)": "", "Year Built*": 2001}
+
+
+def test_parse_labels_ignore_case_and_punctuation():
+    assert parse_house_features("BEDROOMS:\t4\nyear-built\t2001") == {"Bedrooms*": 4, "Year Built*": 2001}
+
+
+def test_parse_first_occurrence_wins_and_wanted_filters():
+    text = "Bedrooms\n3\nBeds\n5\nYear Built\n1990"
+    assert parse_house_features(text) == {"Bedrooms*": 3, "Year Built*": 1990}
+    assert parse_house_features(text, wanted=["Year Built*"]) == {"Year Built*": 1990}
+
+
+def test_unconvertible_values_keep_their_text():
+    assert parse_house_features("Bedrooms\nUnknown") == {"Bedrooms*": "Unknown"}
+    assert to_int("n/a") is None
+    assert to_float("3") == 3 and isinstance(to_float("3"), int)
+
+
+def test_convert_types_network_values():
+    assert HOUSE_FEATURE_SCHEMA.convert({"Bedrooms*": "4", "Other": "x"}) == {"Bedrooms*": 4, "Other": "x"}
@@ -0,0 +1,75 @@
+import csv
+
+from addresses import LeadGroups
+from journal import DONE, FAILED, NOT_FOUND, PENDING, Journal, rebuild_output
+from output_writer import LeadRecord
+
+
+def test_resume_keeps_finished_leads(tmp_path):
+    path = str(tmp_path / "leads.journal.sqlite")
+    journal = Journal(path)
+    journal.add_leads(["a", "b", "c"])
+    journal.mark_done(LeadRecord(address="a", estimate="$1", house_features={"Bedrooms*": 3}))
+    journal.mark_not_found("b", "search", "No location found")
+    journal.close()
+
+    # The run was interrupted; a resumed run reopens the journal and reads the file again
+    journal = Journal(path)
+    journal.add_leads(["a", "b", "c", "d"])
+
+    assert journal.finished() == {"a", "b"}
+    assert journal.pending() == ["c", "d"]
+    assert journal.counts() == {DONE: 1, NOT_FOUND: 1, PENDING: 2}
+    [record] = journal.completed_records()
+    assert record == LeadRecord(address="a", estimate="$1", house_features={"Bedrooms*": 3})
+    assert journal.record("a") == record
+    assert journal.record("b") is None
+    journal.close()
+
+
+def test_failed_lead_is_not_finished_and_latest_outcome_wins(tmp_path):
+    journal = Journal(str(tmp_path / "j.sqlite"))
+    journal.add_leads(["a"])
+
+    journal.mark_failed("a", "timed out", "timeout", "wait_details")
+    assert journal.pending() == ["a"]
+    assert journal.counts() == {FAILED: 1}
+
+    journal.mark_done(LeadRecord(address="a"))
+    assert journal.finished() == {"a"}
+    assert list(journal.failed_leads()) == []
+    journal.close()
+
+
+def test_reset_forgets_leads_and_variants(tmp_path):
+    journal = Journal(str(tmp_path / "j.sqlite"))
+    journal.add_leads(["a"])
+    journal.add_variants([("a", "A")])
+
+    journal.reset()
+
+    assert journal.counts() == {}
+    assert journal.lead_groups().variants("a") == ["a"]
+    journal.close()
+
+
+def test_rebuild_writes_one_row_per_input_row_and_the_failures(tmp_path):
+    groups = LeadGroups(["12 Main Street", "9 Oak Rd", "12 MAIN ST", "9 oak road"])
+    path = str(tmp_path / "j.sqlite")
+    journal = Journal(path)
+    journal.add_leads(groups.unique)
+    journal.add_variants(list(groups.variant_pairs()))
+    journal.mark_done(LeadRecord(address="12 Main Street", estimate="$1"))
+    journal.mark_failed("9 Oak Rd", "Property page did not load", "timeout", "wait_details")
+    journal.close()
+
+    rows = rebuild_output(path, str(tmp_path / "out.csv"), "csv")
+
+    assert rows == 2
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as f:
+        assert [(row[0], row[1]) for row in csv.reader(f)][1:] == [("12 Main Street", "$1"), ("12 MAIN ST", "$1")]
+    with open(tmp_path / "out.failures.csv", newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f))[1:] == [
+            ["9 Oak Rd", "timeout", "wait_details", "1", "Property page did not load"],
+            ["9 oak road", "timeout", "wait_details", "1", "Property page did not load"],
+        ]
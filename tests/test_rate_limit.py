@@ -0,0 +1,68 @@
+import rate_limit
+from rate_limit import PAGE_LOAD, RateLimiter, RateLimits, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_paces(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit, "time", clock)
+    bucket = TokenBucket(rate=2.0, burst=3)
+
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take() == 0.5
+    assert bucket.take() == 0.5
+    assert clock.slept == 1.0
+
+
+def test_token_bucket_refills_up_to_burst(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit, "time", clock)
+    bucket = TokenBucket(rate=1.0, burst=2)
+    bucket.take()
+    bucket.take()
+
+    clock.advance(60)
+
+    assert [bucket.take() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.take() == 1.0
+
+
+def test_backoff_doubles_up_to_max_and_holds_every_action(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit, "time", clock)
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda low, high: high)
+    limiter = RateLimiter(RateLimits(backoff_base=2.0, backoff_max=5.0, burst=100), log=lambda message: None)
+
+    limiter.backoff("slow page")
+    limiter.acquire(PAGE_LOAD)
+    assert clock.slept == 2.0
+
+    limiter.backoff("slow page")
+    limiter.backoff("slow page")
+    assert limiter.backoffs == 3
+    clock.slept = 0.0
+    limiter.acquire(PAGE_LOAD)
+    assert clock.slept == 5.0  # 4, then 8 capped at 5
+
+
+def test_success_steps_the_backoff_level_down(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit, "time", clock)
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda low, high: high)
+    limiter = RateLimiter(RateLimits(backoff_base=2.0, backoff_max=120.0), log=lambda message: None)
+    limiter.backoff("x")
+    limiter.backoff("x")
+
+    limiter.success()
+    clock.advance(100)
+    limiter.backoff("x")
+    clock.slept = 0.0
+    limiter.acquire(PAGE_LOAD)
+
+    assert clock.slept == 4.0  # Level 1 again after the success, not level 2
+
+
+def test_observe_backs_off_only_past_slow_response():
+    calls = []
+    limiter = RateLimiter(RateLimits(slow_response=8.0), log=lambda message: None)
+    limiter.backoff = calls.append
+
+    limiter.observe(7.9, "property page")
+    limiter.observe(8.1, "property page")
+
+    assert calls == ["slow property page (8.1s)"]
@@ -0,0 +1,82 @@
+import pytest
+
+import result_cache
+from output_writer import LeadRecord
+from result_cache import DAY, SECTIONS, ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(result_cache, "time", clock)
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+RECORD = LeadRecord(address="12 Main Street", estimate="$1", records={"Deed": {"Sale Price": "$90"}})
+
+
+def test_miss_then_hit(cache):
+    assert cache.get("12 Main Street") == (None, set(SECTIONS))
+
+    cache.put(RECORD)
+    record, stale = cache.get("12 Main Street")
+
+    assert stale == set()
+    assert record == RECORD
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_spellings_of_one_address_share_an_entry(cache):
+    cache.put(RECORD)
+    record, stale = cache.get("12 MAIN ST.")
+
+    assert stale == set()
+    assert record.address == "12 MAIN ST."
+    assert record.records == RECORD.records
+    assert cache.hits == 1
+
+
+def test_sections_expire_on_their_own_ttl(cache, clock):
+    cache.put(RECORD)
+
+    clock.advance(4 * DAY)
+    record, stale = cache.get("12 Main Street")
+    assert stale == {"estimate", "activity"}
+    assert record.records == RECORD.records
+
+    clock.advance(11 * DAY)
+    assert cache.get("12 Main Street")[1] == {"estimate", "activity", "records"}
+
+
+def test_reused_sections_keep_their_fetch_time(cache, clock):
+    cache.put(RECORD)
+    clock.advance(13 * DAY)
+
+    # Estimate and activity were fetched again; the records came from the cache
+    cache.put(LeadRecord(address="12 Main Street", estimate="$2", records=RECORD.records), reused={"records"})
+    clock.advance(2 * DAY)
+    record, stale = cache.get("12 Main Street")
+
+    assert record.estimate == "$2"
+    assert stale == {"records"}
+    assert cache.reused == 1
+
+
+def test_every_section_stale_is_a_miss(cache, clock):
+    cache.put(RECORD)
+    clock.advance(181 * DAY)
+
+    assert cache.get("12 Main Street") == (None, set(SECTIONS))
+    assert cache.stale == 1
+
+
+def test_ttls_can_be_overridden(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(result_cache, "time", clock)
+    cache = ResultCache(str(tmp_path / "cache.sqlite"), ttls={"estimate": 60})
+    cache.put(RECORD)
+
+    clock.advance(61)
+
+    assert cache.get("12 Main Street")[1] == {"estimate"}
+    cache.close()
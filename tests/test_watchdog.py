@@ -0,0 +1,44 @@
+import threading
+import time
+
+from watchdog import LeadWatchdog
+
+
+def test_expires_only_leads_past_their_deadline():
+    expired = []
+    done = threading.Event()
+
+    def on_expire(watch):
+        expired.append((watch.address, watch.pooled, watch.stage))
+        done.set()
+
+    watchdog = LeadWatchdog(0.05, on_expire, stage_of=lambda thread: "search", interval=0.01)
+    watchdog.start()
+    try:
+        with watchdog.watch("quick", "browser-1") as watch:
+            pass
+        assert not watch.expired
+
+        with watchdog.watch("stuck", "browser-2") as watch:
+            assert done.wait(2)
+        assert watch.expired and watch.stage == "search"
+    finally:
+        watchdog.close()
+
+    assert expired == [("stuck", "browser-2", "search")]
+    assert watchdog.expired == 1
+
+
+def test_callback_errors_are_logged_and_supervision_goes_on():
+    logged = []
+    watchdog = LeadWatchdog(0.01, lambda watch: 1 / 0, log=logged.append, interval=0.01)
+    watchdog.start()
+    try:
+        with watchdog.watch("a", None):
+            time.sleep(0.1)
+        with watchdog.watch("b", None):
+            time.sleep(0.1)
+    finally:
+        watchdog.close()
+
+    assert [message.split(" after")[0] for message in logged] == ["Failed to stop a", "Failed to stop b"]
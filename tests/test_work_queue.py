@@ -0,0 +1,122 @@
+import csv
+
+import pytest
+
+import work_queue
+from addresses import LeadGroups
+from journal import DONE, FAILED, NOT_FOUND, PENDING
+from output_writer import LeadRecord
+from work_queue import CLAIMED, WorkQueue, merge
+
+
+@pytest.fixture
+def make_queue(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(work_queue, "time", clock)
+    queues = []
+
+    def make(**options):
+        queue = WorkQueue(str(tmp_path / "leads.queue.sqlite"), **options)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def test_claims_in_input_order_and_never_twice(make_queue):
+    queue = make_queue()
+    queue.add_leads(["a", "b"])
+    queue.add_leads(["c", "a"])
+
+    assert [queue.claim("w1"), queue.claim("w2"), queue.claim("w1")] == ["a", "b", "c"]
+    assert queue.claim("w2") is None
+    assert queue.counts() == {CLAIMED: 3}
+
+
+def test_expired_lease_is_reclaimed(make_queue, clock):
+    queue = make_queue(lease=60)
+    queue.add_leads(["a"])
+    assert queue.claim("crashed") == "a"
+
+    clock.advance(30)
+    assert queue.claim("w2") is None
+    clock.advance(31)
+    assert queue.claim("w2") == "a"
+    assert queue.remaining() == 1
+
+
+def test_late_result_from_expired_lease_still_counts(make_queue, clock):
+    queue = make_queue(lease=60)
+    queue.add_leads(["a"])
+    queue.claim("slow")
+    clock.advance(61)
+    queue.claim("w2")
+
+    queue.mark_done(LeadRecord(address="a", estimate="$1"))
+
+    assert queue.counts() == {DONE: 1}
+    assert [record.estimate for record in queue.completed_records()] == ["$1"]
+
+
+def test_failed_lead_is_retried_until_max_attempts(make_queue):
+    queue = make_queue(max_attempts=2)
+    queue.add_leads(["a"])
+
+    queue.claim("w")
+    queue.mark_failed("a", "boom", "timeout", "wait_details")
+    assert queue.counts() == {PENDING: 1}
+
+    assert queue.claim("w") == "a"
+    queue.mark_failed("a", "boom again", "timeout", "wait_details")
+    assert queue.counts() == {FAILED: 1}
+    assert queue.claim("w") is None
+
+    [failed] = queue.failed_leads()
+    assert (failed.address, failed.failure, failed.stage, failed.attempts, failed.error) == \
+        ("a", "timeout", "wait_details", 2, "boom again")
+
+
+def test_permanent_failure_is_not_retried(make_queue):
+    queue = make_queue(max_attempts=3)
+    queue.add_leads(["a"])
+
+    queue.claim("w")
+    queue.mark_failed("a", "No location found", NOT_FOUND, "search")
+
+    assert queue.counts() == {FAILED: 1}
+    assert queue.claim("w") is None
+
+
+def test_lease_expiring_on_the_last_attempt_fails_the_lead(make_queue, clock):
+    queue = make_queue(lease=60, max_attempts=1)
+    queue.add_leads(["a"])
+    queue.claim("crashed")
+
+    clock.advance(61)
+
+    assert queue.claim("w2") is None
+    assert queue.counts() == {FAILED: 1}
+    assert queue.remaining() == 0
+
+
+def test_merge_writes_every_input_row_and_the_failures(make_queue, tmp_path):
+    groups = LeadGroups(["1 A St", "2 B Rd", "1 a street", "2 b road"])
+    queue = make_queue(max_attempts=1)
+    queue.add_leads(groups.unique)
+    queue.add_variants(groups.variant_pairs())
+    queue.claim("w")
+    queue.mark_done(LeadRecord(address="1 A St"))
+    queue.claim("w")
+    queue.mark_not_found("2 B Rd", "search", "No location found")
+    queue.close()
+
+    rows = merge(str(tmp_path / "leads.queue.sqlite"), str(tmp_path / "out.csv"), "csv")
+
+    assert rows == 2
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as f:
+        assert [row[0] for row in csv.reader(f)][1:] == ["1 A St", "1 a street"]
+    with open(tmp_path / "out.failures.csv", newline="", encoding="utf-8") as f:
+        assert [row[:3] for row in csv.reader(f)][1:] == [
+            ["2 B Rd", NOT_FOUND, "search"], ["2 b road", NOT_FOUND, "search"],
+        ]